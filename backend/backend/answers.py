@@ -0,0 +1,37 @@
+YES_NO_VALUES = {'yes': True, 'no': False}
+YES_NO_LABELS = {True: 'Yes', False: 'No'}
+RATING_MAX = 32767  # SmallIntegerField upper bound
+
+
+def parse_rating(answer_text):
+    """Integer rating for a digit-only answer, or None"""
+    if not answer_text.isdigit():
+        return None
+    try:
+        value = int(answer_text)
+    except ValueError:  # digit characters int() rejects, e.g. superscripts
+        return None
+    return value if value <= RATING_MAX else None
+
+
+def typed_answer_fields(question_type, answer_text, option_ids):
+    """Values for Answer's typed columns parsed from answer_text.
+
+    `option_ids` maps option text to id for the answered question.
+    """
+    fields = {'rating_value': None, 'option_id': None, 'bool_value': None}
+    if question_type == 'rating':
+        fields['rating_value'] = parse_rating(answer_text)
+    elif question_type == 'yes_no':
+        fields['bool_value'] = YES_NO_VALUES.get(answer_text.strip().lower())
+    elif question_type == 'multiple_choice':
+        fields['option_id'] = option_ids.get(answer_text)
+    return fields
+
+
+def option_ids_by_text(options):
+    """Map option text to id, keeping the first option for duplicate texts"""
+    option_ids = {}
+    for option in options:
+        option_ids.setdefault(option.text, option.id)
+    return option_ids
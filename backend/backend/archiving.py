@@ -0,0 +1,210 @@
+"""Moves the responses of closed surveys out of the hot tables.
+
+archive_survey first snapshots what results needs (stored tallies, the
+completed-response count and every segmented view) into a SurveyArchive,
+then moves responses and answers in id order, one transaction per batch,
+into ArchiveChunk rows of zlib-compressed columnar JSON. An interrupted run
+resumes after the last chunk written.
+"""
+import json
+import zlib
+from datetime import datetime
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from .caching import invalidate_segmented_results
+from .exports import RESPONSE_COLUMNS
+from .models import Survey, Response, Answer, SurveyArchive, ArchiveChunk, ArchivedDedupeKey
+from .results import completed_responses, survey_results
+from .segments import SEGMENTATIONS, segmented_results
+from .tallies import rebuild_tallies
+
+ANSWER_COLUMNS = ['id', 'response_id', 'question_id', 'answer_text', 'rating_value', 'option_id', 'bool_value']
+COMPRESSION_LEVEL = 6
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def segmentation_key(group_by, bucket):
+    return f'{group_by or "-"}:{bucket or "-"}'
+
+
+def survey_archive(survey):
+    """The survey's SurveyArchive, or None (no query if select_related)"""
+    try:
+        return survey.archive
+    except SurveyArchive.DoesNotExist:
+        return None
+
+
+@transaction.atomic
+def snapshot(survey):
+    """Create the survey's archive with the aggregates results reads from it"""
+    questions = list(survey.questions.all())
+    # Stored tallies become the only source for these questions, so make them exact
+    rebuild_tallies(questions)
+    return SurveyArchive.objects.create(
+        survey=survey,
+        last_response_id=Response.objects.filter(survey=survey).aggregate(last=Max('id'))['last'] or 0,
+        completed_count=completed_responses(survey).count(),
+        segmented_results={
+            segmentation_key(group_by, bucket): segmented_results(survey, group_by, bucket)
+            for group_by, bucket in SEGMENTATIONS
+        },
+    )
+
+
+def encode_chunk(responses, answers):
+    """Column lists of response and answer rows, as compressed JSON"""
+    columns = {
+        'responses': {name: list(values) for name, values in zip(RESPONSE_COLUMNS, zip(*responses))},
+        'answers': {name: list(values) for name, values in zip(ANSWER_COLUMNS, zip(*answers))},
+    }
+    for index, created_at in enumerate(columns['responses'].get('created_at', [])):
+        columns['responses']['created_at'][index] = created_at.isoformat() if created_at else None
+    raw = json.dumps(columns, separators=(',', ':')).encode()
+    return raw, zlib.compress(raw, COMPRESSION_LEVEL)
+
+
+def decode_chunk(chunk):
+    """(response rows, answer rows) of a chunk, as dicts in id order"""
+    columns = json.loads(zlib.decompress(chunk.data))
+
+    def rows(table, names):
+        values = [columns[table].get(name, []) for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    responses = rows('responses', RESPONSE_COLUMNS)
+    for response in responses:
+        if response['created_at']:
+            response['created_at'] = datetime.fromisoformat(response['created_at'])
+    return responses, rows('answers', ANSWER_COLUMNS)
+
+
+@transaction.atomic
+def archive_batch(archive, batch_size):
+    """Move the next `batch_size` responses into one chunk; returns the chunk or None"""
+    ids = list(
+        Response.objects.filter(
+            survey_id=archive.survey_id, id__lte=archive.last_response_id
+        ).order_by('id').values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return None
+
+    responses = list(Response.objects.filter(id__in=ids).order_by('id').values_list(*RESPONSE_COLUMNS))
+    answers = list(
+        Answer.objects.filter(response_id__in=ids).order_by('response_id', 'id').values_list(*ANSWER_COLUMNS)
+    )
+    raw, data = encode_chunk(responses, answers)
+    chunk = ArchiveChunk.objects.create(
+        archive=archive,
+        first_response_id=ids[0],
+        last_response_id=ids[-1],
+        response_count=len(responses),
+        answer_count=len(answers),
+        data=data,
+    )
+    # Deleted responses no longer hold their dedupe keys; keep them for dedupe.py
+    ArchivedDedupeKey.objects.bulk_create([
+        ArchivedDedupeKey(survey_id=archive.survey_id, dedupe_key=key)
+        for key in Response.objects.filter(id__in=ids, dedupe_key__isnull=False).values_list('dedupe_key', flat=True)
+    ], ignore_conflicts=True)
+    # Answers first, so the response delete has nothing left to cascade to
+    Answer.objects.filter(response_id__in=ids).delete()
+    Response.objects.filter(id__in=ids).delete()
+
+    archive.response_count += len(responses)
+    archive.answer_count += len(answers)
+    archive.raw_bytes += len(raw)
+    archive.compressed_bytes += len(data)
+    archive.save(update_fields=['response_count', 'answer_count', 'raw_bytes', 'compressed_bytes'])
+    return chunk
+
+
+def archive_survey(survey, batch_size=None, progress=None):
+    """Archive a closed survey's responses, resuming an interrupted run.
+
+    `progress`, if given, is called with each chunk written. Returns the
+    SurveyArchive.
+    """
+    if survey.status != 'closed':
+        raise ArchiveError(f'Survey {survey.id} is {survey.status}; only closed surveys are archived')
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    archive = survey_archive(survey) or snapshot(survey)
+    if archive.completed_at is None:
+        while (chunk := archive_batch(archive, batch_size)) is not None:
+            if progress:
+                progress(chunk)
+        archive.completed_at = timezone.now()
+        archive.save(update_fields=['completed_at'])
+        invalidate_segmented_results([survey.id])
+    return archive
+
+
+def archived_results(survey, archive):
+    """survey_results for an archived survey, from its stored tallies.
+
+    The snapshot counts every response up to last_response_id, including
+    those an unfinished run has not moved yet; only later ones are added.
+    """
+    live = completed_responses(survey).filter(id__gt=archive.last_response_id).count()
+    return survey_results(survey, archive.completed_count + live)
+
+
+def archived_responses(archive):
+    """Yield (response values tuple, {question_id: answer_text}) for each archived response.
+
+    Same shape and ordering as exports.iter_pivoted_responses.
+    """
+    for chunk in archive.chunks.all().iterator(chunk_size=1):
+        responses, answers = decode_chunk(chunk)
+        by_response = {}
+        for answer in answers:
+            row_answers = by_response.setdefault(answer['response_id'], {})
+            answer_text = answer['answer_text']
+            if answer['question_id'] in row_answers:
+                answer_text = f"{row_answers[answer['question_id']]}; {answer_text}"
+            row_answers[answer['question_id']] = answer_text
+        for response in responses:
+            yield tuple(response[name] for name in RESPONSE_COLUMNS), by_response.get(response['id'], {})
+
+
+def archived_text_answer_page(archive, question, search, after, size):
+    """Up to `size` archived text answers of completed responses, after
+    `after`, a (response id, answer id) position.
+
+    Answers come in (response id, answer id) order, as the chunks store
+    them. Only chunks that end at or after the position are decoded, and
+    reading stops once the page is full. Returns ([(response id, answer id,
+    answer_text)], whether more follow).
+    """
+    search = search.casefold() if search else None
+    page = []
+    chunks = archive.chunks.filter(last_response_id__gte=after[0])
+    for chunk in chunks.iterator(chunk_size=1):
+        responses, answers = decode_chunk(chunk)
+        completed = {response['id'] for response in responses if response['completed']}
+        for answer in answers:
+            if (
+                (answer['response_id'], answer['id']) <= after
+                or answer['question_id'] != question.id
+                or answer['response_id'] not in completed
+                or answer['option_id'] is not None
+                or answer['bool_value'] is not None
+                or answer['rating_value'] is not None
+                or (search is not None and search not in answer['answer_text'].casefold())
+            ):
+                continue
+            if len(page) == size:
+                return page, True
+            page.append((answer['response_id'], answer['id'], answer['answer_text']))
+    return page, False
+
+
+def closed_surveys_to_archive():
+    """Closed surveys that have no archive yet or an unfinished one"""
+    return Survey.objects.filter(status='closed').exclude(archive__completed_at__isnull=False).order_by('id')
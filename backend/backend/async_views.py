@@ -0,0 +1,114 @@
+"""Async views for the respondent-facing endpoints.
+
+These mirror SurveyViewSet.retrieve_public and ResponseViewSet.create but run
+natively under ASGI, so a slow client holds a coroutine instead of a worker
+thread. Payloads and status codes match the DRF endpoints.
+"""
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from .caching import aget_public_survey, aset_public_survey
+from .dedupe import (
+    ais_archived, dedupe_key, duplicate_reply, is_stored, recently_seen, request_idempotency_key
+)
+from .models import Survey, Question, PendingSubmission
+from .payloads import public_survey_payload
+from .renderers import ORJSONRenderer
+from .serializers import ResponseCreateSerializer, QueuedResponseSerializer
+from .submissions import answered_question_ids, save_submissions
+
+
+def json_response(data, status=200, headers=None):
+    # Render as the sync API does so bodies are byte-identical
+    return HttpResponse(
+        ORJSONRenderer().render(data),
+        status=status,
+        content_type='application/json',
+        headers=headers
+    )
+
+
+@require_GET
+async def public_survey(request, pk, public_link):
+    cached = await aget_public_survey(pk, public_link)
+    if cached is None:
+        try:
+            data = await sync_to_async(public_survey_payload)(pk, public_link)
+        except Http404 as exc:
+            return json_response({'detail': str(exc)}, status=404)
+        etag = await aset_public_survey(pk, public_link, data)
+    else:
+        etag, data = cached
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        return HttpResponse(status=304, headers={'ETag': etag})
+    return json_response(data, headers={'ETag': etag})
+
+
+def duplicate_json_response(key):
+    status, data = duplicate_reply(key)
+    return json_response(data, status=status)
+
+
+@sync_to_async
+def save_submission(validated_data):
+    # Transactions are sync-only in Django; run the write in the thread pool
+    with transaction.atomic():
+        save_submissions([validated_data])
+
+
+@csrf_exempt
+@require_POST
+async def submit_response(request):
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return json_response({'detail': 'JSON parse error'}, status=400)
+    if not isinstance(data, dict):
+        return json_response({'non_field_errors': ['Invalid data. Expected a dictionary.']}, status=400)
+
+    idempotency_key = request_idempotency_key(request, data)
+    if idempotency_key:
+        data['idempotency_key'] = idempotency_key
+
+    if settings.RESPONSE_INGESTION_MODE == 'async':
+        serializer = QueuedResponseSerializer(data=data)
+        if not serializer.is_valid():
+            return json_response(serializer.errors, status=400)
+        await PendingSubmission.objects.acreate(payload=serializer.validated_data)
+        return json_response({'message': 'Response queued for processing'}, status=202)
+
+    try:
+        survey = await Survey.objects.select_related('archive').aget(id=int(data.get('survey')))
+    except (Survey.DoesNotExist, TypeError, ValueError):
+        return json_response({'detail': 'No Survey matches the given query.'}, status=404)
+
+    key = dedupe_key(survey, data.get('respondent_email'), idempotency_key)
+    if recently_seen(survey.id, key) or await ais_archived(survey, key):
+        return duplicate_json_response(key)
+
+    questions = {
+        question.id: question
+        async for question in Question.objects.filter(
+            id__in=answered_question_ids([data])
+        ).prefetch_related('options')
+    }
+    serializer = ResponseCreateSerializer(
+        data=data,
+        context={'surveys': {survey.id: survey}, 'questions': questions}
+    )
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status=400)
+
+    try:
+        await save_submission(serializer.validated_data)
+    except IntegrityError:
+        if not await sync_to_async(is_stored)(survey.id, key):
+            raise
+        return duplicate_json_response(key)
+    return json_response({'message': 'Response submitted successfully'}, status=201)
@@ -0,0 +1,49 @@
+import time
+from contextlib import ExitStack, contextmanager
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def isolated_database(verbosity=0):
+    """Run the block against a freshly migrated throwaway test database"""
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    # Point mirrors (the read replica) at the test database, as the test runner does
+    for alias in connections:
+        if connections[alias].settings_dict['TEST']['MIRROR'] == DEFAULT_DB_ALIAS:
+            connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+@contextmanager
+def capture_queries():
+    """Collect the queries run on every database alias (primary and replica)"""
+    captured = []
+    with ExitStack() as stack:
+        contexts = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+        yield captured
+    for context in contexts:
+        captured.extend(context.captured_queries)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def timed(func, *args, **kwargs):
+    """Call func and return (result, elapsed milliseconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
@@ -0,0 +1,191 @@
+"""Saves the survey builder's question list in one set-based pass.
+
+The submitted questions (and their options) are diffed against the stored
+ones by id: rows without an id are inserted, rows whose fields or position
+changed are updated, and stored rows missing from the list are deleted.
+Each kind of change is one bulk statement, so saving a survey costs a
+fixed number of queries however many questions it has.
+"""
+from django.db import transaction
+from rest_framework import serializers
+from .caching import invalidate_public_survey, invalidate_segmented_results
+from .models import Question, QuestionOption, QuestionTally, SurveyArchive
+
+QUESTION_FIELDS = ['type', 'question', 'description', 'required', 'order']
+OPTION_FIELDS = ['text', 'order']
+# PATCH validates the nested items as partial, so new rows are checked here
+REQUIRED_QUESTION_FIELDS = ['type', 'question']
+REQUIRED_OPTION_FIELDS = ['text']
+# Only these question types keep options, as in the original create()
+OPTION_TYPES = ('multiple_choice',)
+
+
+def changed_fields(instance, data, fields):
+    """Set the differing `fields` of `instance` from `data`; returns their names"""
+    changed = []
+    for field in fields:
+        if field in data and getattr(instance, field) != data[field]:
+            setattr(instance, field, data[field])
+            changed.append(field)
+    return changed
+
+
+def diff_rows(stored, submitted, fields, label, required):
+    """Match submitted dicts to stored instances by id.
+
+    Returns (matched pairs, unmatched submitted dicts, unsubmitted instances,
+    names of updated fields). Ids that are not in `stored`, and new rows
+    missing a `required` field, are an error.
+    """
+    matched = []
+    new = []
+    seen = set()
+    updated_fields = set()
+    for data in submitted:
+        pk = data.get('id')
+        if pk is None:
+            missing = [field for field in required if field not in data]
+            if missing:
+                raise serializers.ValidationError({label: [f"New {label} need {', '.join(missing)}."]})
+            new.append(data)
+            continue
+        if pk not in stored or pk in seen:
+            raise serializers.ValidationError({label: [f'Unknown or repeated id {pk}.']})
+        seen.add(pk)
+        instance = stored[pk]
+        changed = changed_fields(instance, data, fields)
+        updated_fields.update(changed)
+        matched.append((instance, data, changed))
+    removed = [instance for pk, instance in stored.items() if pk not in seen]
+    return matched, new, removed, updated_fields
+
+
+def model_fields(data, fields):
+    return {field: data[field] for field in fields if field in data}
+
+
+def submitted_order(items):
+    """Default each item's `order` to its position in the submitted list"""
+    return [{'order': position, **item} for position, item in enumerate(items)]
+
+
+def ensure_editable(survey_id):
+    # Archived answers are only counted in the stored tallies, which must stay as they are
+    if SurveyArchive.objects.filter(survey_id=survey_id).exists():
+        raise serializers.ValidationError({'questions': ['Questions of an archived survey cannot change.']})
+
+
+class OptionChanges:
+    """Option rows to insert, update and delete, collected across questions"""
+
+    def __init__(self):
+        self.inserts = []
+        self.updates = []
+        self.deletes = []
+        self.fields = set()
+
+    def diff(self, question, current, data):
+        """Collect what makes `question`'s options (`current`, by id) match
+        `data`; returns whether the question's tally goes stale"""
+        if question.type not in OPTION_TYPES:
+            self.deletes += current.values()
+            return False
+        if 'options' not in data:
+            return False
+        matched, new, removed, fields = diff_rows(
+            current, submitted_order(data['options']), OPTION_FIELDS, 'options', REQUIRED_OPTION_FIELDS
+        )
+        self.fields.update(fields)
+        self.updates += [option for option, _, changed in matched if changed]
+        self.deletes += removed
+        self.inserts += [
+            QuestionOption(question=question, **model_fields(option_data, OPTION_FIELDS))
+            for option_data in new
+        ]
+        return bool(removed) or 'text' in fields
+
+    def save(self):
+        if self.inserts:
+            QuestionOption.objects.bulk_create(self.inserts)
+        if self.updates:
+            QuestionOption.objects.bulk_update(self.updates, sorted(self.fields))
+        if self.deletes:
+            QuestionOption.objects.filter(id__in=[option.id for option in self.deletes]).delete()
+
+
+def questions_saved(survey_id, stale):
+    """Drop the tallies of `stale` question ids and, on commit, the survey's caches"""
+    # Results rebuilds missing tallies on its next request
+    if stale:
+        QuestionTally.objects.filter(question_id__in=stale).delete()
+    # Bulk writes send no model signals, so invalidate once for the survey
+    transaction.on_commit(lambda: (
+        invalidate_public_survey(survey_id), invalidate_segmented_results([survey_id])
+    ))
+
+
+@transaction.atomic
+def save_questions(survey, questions_data):
+    """Make `survey`'s questions and options match `questions_data`.
+
+    Each question dict may carry the `id` of an existing question of this
+    survey and an `options` list; a question without `options` keeps the
+    ones it has. Returns a dict of row counts per change.
+    """
+    ensure_editable(survey.id)
+    stored_questions = {question.id: question for question in survey.questions.all()}
+    stored_options = {}
+    if stored_questions:
+        for option in QuestionOption.objects.filter(question__survey=survey):
+            stored_options.setdefault(option.question_id, {})[option.id] = option
+
+    questions_data = submitted_order(questions_data)
+    matched, new, removed, question_fields = diff_rows(
+        stored_questions, questions_data, QUESTION_FIELDS, 'questions', REQUIRED_QUESTION_FIELDS
+    )
+
+    options = OptionChanges()
+    # Questions whose stored tallies no longer match how their answers are counted
+    stale = set()
+    for question, data, changed in matched:
+        if options.diff(question, stored_options.get(question.id, {}), data) or 'type' in changed:
+            stale.add(question.id)
+
+    new_questions = Question.objects.bulk_create([
+        Question(survey=survey, **model_fields(data, QUESTION_FIELDS)) for data in new
+    ])
+    for question, data in zip(new_questions, new):
+        # A new question has no stored options, so every one must be new
+        options.diff(question, {}, {'options': data.get('options', [])})
+
+    question_updates = [question for question, _, changed in matched if changed]
+    if question_updates:
+        Question.objects.bulk_update(question_updates, sorted(question_fields))
+    if removed:
+        Question.objects.filter(id__in=[question.id for question in removed]).delete()
+    options.save()
+    questions_saved(survey.id, stale)
+
+    return {
+        'questionsCreated': len(new_questions),
+        'questionsUpdated': len(question_updates),
+        'questionsDeleted': len(removed),
+        'optionsCreated': len(options.inserts),
+        'optionsUpdated': len(options.updates),
+        'optionsDeleted': len(options.deletes),
+    }
+
+
+@transaction.atomic
+def save_question(question, data):
+    """Apply one question's fields and, when `data` has `options`, diff them
+    in as save_questions does (/api/questions/<id>/)"""
+    ensure_editable(question.survey_id)
+    changed = changed_fields(question, data, QUESTION_FIELDS)
+    options = OptionChanges()
+    stale = options.diff(question, {option.id: option for option in question.options.all()}, data)
+    if changed:
+        question.save(update_fields=changed)
+    options.save()
+    questions_saved(question.survey_id, [question.id] if stale or 'type' in changed else [])
+    return question
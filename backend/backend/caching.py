@@ -0,0 +1,70 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from .segments import SEGMENTATIONS
+
+
+def public_survey_key(survey_id):
+    return f'public-survey:{survey_id}'
+
+
+def cache_entry(public_link, data):
+    """Cache entry and ETag for a serialized public survey"""
+    body = json.dumps(data, sort_keys=True, separators=(',', ':')).encode()
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    return {'public_link': public_link, 'etag': etag, 'data': data}
+
+
+def entry_result(entry, public_link):
+    # Entries carry the link they were built for, so a regenerated link never hits
+    if entry is None or entry['public_link'] != public_link:
+        return None
+    return entry['etag'], entry['data']
+
+
+def get_public_survey(survey_id, public_link):
+    """Cached (etag, payload) for a public survey, or None on a miss"""
+    return entry_result(cache.get(public_survey_key(survey_id)), public_link)
+
+
+def set_public_survey(survey_id, public_link, data):
+    """Cache a serialized public survey and return its ETag"""
+    entry = cache_entry(public_link, data)
+    cache.set(public_survey_key(survey_id), entry, settings.PUBLIC_SURVEY_CACHE_TIMEOUT)
+    return entry['etag']
+
+
+async def aget_public_survey(survey_id, public_link):
+    return entry_result(await cache.aget(public_survey_key(survey_id)), public_link)
+
+
+async def aset_public_survey(survey_id, public_link, data):
+    entry = cache_entry(public_link, data)
+    await cache.aset(public_survey_key(survey_id), entry, settings.PUBLIC_SURVEY_CACHE_TIMEOUT)
+    return entry['etag']
+
+
+def invalidate_public_survey(survey_id):
+    cache.delete(public_survey_key(survey_id))
+
+
+def segmented_results_key(survey_id, group_by, bucket):
+    return f'survey-results:{survey_id}:{group_by or "-"}:{bucket or "-"}'
+
+
+def get_segmented_results(survey_id, group_by, bucket):
+    return cache.get(segmented_results_key(survey_id, group_by, bucket))
+
+
+def set_segmented_results(survey_id, group_by, bucket, data):
+    cache.set(segmented_results_key(survey_id, group_by, bucket), data, settings.SEGMENTED_RESULTS_CACHE_TIMEOUT)
+
+
+def invalidate_segmented_results(survey_ids):
+    """Drop every cached segmentation of the given surveys"""
+    cache.delete_many([
+        segmented_results_key(survey_id, group_by, bucket)
+        for survey_id in survey_ids
+        for group_by, bucket in SEGMENTATIONS
+    ])
@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.db import transaction
+from .archiving import archived_responses, survey_archive
+from .exports import RESPONSE_COLUMNS
+from .models import Survey, Question, QuestionOption, Response
+
+ROSTER_FIELDS = ('respondent_email', 'respondent_name', 'department')
+
+
+@transaction.atomic
+def clone_survey(survey, creator_id=None, title=None, include_roster=False):
+    """Copy a survey with its questions and options as a new draft.
+
+    Questions and options are each written with one bulk_create (split
+    only by the database's parameter limit), so the query count does not
+    grow with the size of the template. With `include_roster`, every
+    distinct respondent of the source, archived or not, becomes an
+    incomplete response on the copy; answers are never copied. Returns (clone, copied counts).
+    """
+    clone = Survey.objects.create(
+        title=title or f'{survey.title} (copy)',
+        description=survey.description,
+        creator_id=creator_id or survey.creator_id,
+        status='draft',
+        unique_respondents=survey.unique_respondents
+    )
+
+    questions = list(survey.questions.order_by('order', 'id'))
+    new_questions = Question.objects.bulk_create([
+        Question(
+            survey=clone,
+            type=question.type,
+            question=question.question,
+            description=question.description,
+            required=question.required,
+            order=question.order
+        )
+        for question in questions
+    ])
+    # bulk_create returns the copies in input order, with their new primary keys
+    question_ids = {old.id: new.id for old, new in zip(questions, new_questions)}
+
+    options = QuestionOption.objects.bulk_create([
+        QuestionOption(question_id=question_ids[option.question_id], text=option.text, order=option.order)
+        for option in QuestionOption.objects.filter(question__survey=survey).order_by('question_id', 'order', 'id')
+    ])
+
+    respondents = 0
+    if include_roster:
+        respondents = copy_roster(survey, clone)
+
+    return clone, {'questions': len(new_questions), 'options': len(options), 'respondents': respondents}
+
+
+def roster(source, batch_size):
+    """Distinct (email, name, department) of `source`'s respondents with an email.
+
+    An archived survey's moved responses are read from its chunks, then
+    the rows still in the Response table, dropping repeats across both.
+    """
+    live = Response.objects.filter(
+        survey=source, respondent_email__isnull=False
+    ).exclude(respondent_email='').values_list(*ROSTER_FIELDS).distinct().order_by()
+    archive = survey_archive(source)
+    if archive is None:
+        yield from live.iterator(chunk_size=batch_size)
+        return
+    positions = [RESPONSE_COLUMNS.index(field) for field in ROSTER_FIELDS]
+    seen = set()
+    for values, _ in archived_responses(archive):
+        values = tuple(values[position] for position in positions)
+        if values[0] and values not in seen:
+            seen.add(values)
+            yield values
+    for values in live.iterator(chunk_size=batch_size):
+        if values not in seen:
+            seen.add(values)
+            yield values
+
+
+def copy_roster(source, target, batch_size=None):
+    """Add each distinct named respondent of `source` to `target` as an incomplete response"""
+    batch_size = batch_size or settings.RESPONDENT_IMPORT_BATCH_SIZE
+    copied = 0
+    batch = []
+    for values in roster(source, batch_size):
+        batch.append(Response(survey=target, **dict(zip(ROSTER_FIELDS, values))))
+        if len(batch) >= batch_size:
+            Response.objects.bulk_create(batch)
+            copied += len(batch)
+            batch = []
+    if batch:
+        Response.objects.bulk_create(batch)
+        copied += len(batch)
+    return copied
@@ -0,0 +1,153 @@
+"""Rejects repeated submissions before any answers are written.
+
+A submission's dedupe key is the SHA-256 of its respondent email when the
+survey allows one response per email (Survey.unique_respondents), else of
+its client-supplied idempotency key; submissions with neither are never
+deduplicated. The key is stored on Response under a partial unique
+constraint, which is the guarantee. Archiving deletes responses, so their
+keys are copied to ArchivedDedupeKey first and checked from there. A
+per-process LRU of recently written keys turns most retries into a
+dictionary lookup without touching the database; deleting a response
+evicts its key from the LRU of the process that deleted it.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.db import transaction
+from .archiving import survey_archive
+from .models import Response, ArchivedDedupeKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 200
+
+
+class RecentKeys:
+    """Bounded set of (survey id, dedupe key) pairs, least recently used out first"""
+
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.keys = OrderedDict()
+
+    def __contains__(self, key):
+        with self.lock:
+            if key in self.keys:
+                self.keys.move_to_end(key)
+                return True
+            return False
+
+    def discard(self, key):
+        with self.lock:
+            self.keys.pop(key, None)
+
+    def add(self, key):
+        with self.lock:
+            self.keys[key] = None
+            self.keys.move_to_end(key)
+            while len(self.keys) > self.size:
+                self.keys.popitem(last=False)
+
+
+recent_keys = RecentKeys(settings.RESPONSE_DEDUPE_CACHE_SIZE)
+
+
+def dedupe_key(survey, respondent_email=None, idempotency_key=None):
+    """('email' or 'key', digest) for a submission to `survey`, or None"""
+    email = respondent_email.strip().lower() if isinstance(respondent_email, str) else ''
+    if survey.unique_respondents and email:
+        kind, value = 'email', email
+    elif idempotency_key:
+        kind, value = 'key', idempotency_key
+    else:
+        return None
+    return kind, hashlib.sha256(f'{kind}:{value}'.encode()).hexdigest()
+
+
+def submission_key(submission):
+    """dedupe_key of validated submission data (ResponseCreateSerializer)"""
+    return dedupe_key(
+        submission['survey'], submission.get('respondent_email'), submission.get('idempotency_key')
+    )
+
+
+def request_idempotency_key(request, data):
+    """The Idempotency-Key header, else an `idempotency_key` in the body"""
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None and hasattr(data, 'get'):
+        key = data.get('idempotency_key')
+    return key if isinstance(key, str) and key else None
+
+
+def recently_seen(survey_id, key):
+    return key is not None and (survey_id, key[1]) in recent_keys
+
+
+def remember_on_commit(responses):
+    """Add the dedupe keys of `responses` to recent_keys once their transaction commits"""
+    keys = [(response.survey_id, response.dedupe_key) for response in responses if response.dedupe_key]
+    if keys:
+        transaction.on_commit(lambda: [recent_keys.add(key) for key in keys])
+
+
+def forget_on_commit(response):
+    """Drop a deleted response's dedupe key from recent_keys once the delete commits"""
+    if response.dedupe_key:
+        key = (response.survey_id, response.dedupe_key)
+        transaction.on_commit(lambda: recent_keys.discard(key))
+
+
+def find_duplicates(submissions):
+    """Which validated submissions are duplicates, as a list of booleans.
+
+    A duplicate repeats a recently written key, a stored or archived
+    response's key (one query for the whole list) or an earlier submission
+    in the list.
+    """
+    keys = [submission_key(submission) for submission in submissions]
+    digests = {key[1] for key in keys if key is not None}
+    stored = set()
+    if digests:
+        survey_ids = {submission['survey'].id for submission in submissions}
+        stored = set(Response.objects.filter(
+            survey_id__in=survey_ids, dedupe_key__in=digests
+        ).values_list('survey_id', 'dedupe_key').union(ArchivedDedupeKey.objects.filter(
+            survey_id__in=survey_ids, dedupe_key__in=digests
+        ).values_list('survey_id', 'dedupe_key')))
+
+    flags, seen = [], set()
+    for submission, key in zip(submissions, keys):
+        if key is None:
+            flags.append(False)
+            continue
+        pair = (submission['survey'].id, key[1])
+        flags.append(pair in seen or pair in stored or pair in recent_keys)
+        seen.add(pair)
+    return flags
+
+
+def is_stored(survey_id, key):
+    """Whether a response with this dedupe key exists, e.g. after an IntegrityError"""
+    return key is not None and Response.objects.filter(survey_id=survey_id, dedupe_key=key[1]).exists()
+
+
+def archived_keys(survey, key):
+    return ArchivedDedupeKey.objects.filter(survey_id=survey.id, dedupe_key=key[1])
+
+
+def is_archived(survey, key):
+    """Whether an archived response of `survey` had this dedupe key
+    (no query unless the survey is archived; select_related('archive'))"""
+    return key is not None and survey_archive(survey) is not None and archived_keys(survey, key).exists()
+
+
+async def ais_archived(survey, key):
+    return key is not None and survey_archive(survey) is not None and await archived_keys(survey, key).aexists()
+
+
+def duplicate_reply(key):
+    """(status, body) for a rejected duplicate: a replayed idempotency key
+    succeeds without writing, a second response from one email conflicts"""
+    if key[0] == 'email':
+        return 409, {'error': 'This email has already responded to this survey'}
+    return 200, {'message': 'Response already submitted'}
@@ -0,0 +1,95 @@
+import csv
+import json
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from .models import Response, Answer
+
+DEFAULT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+RESPONSE_COLUMNS = [
+    'id', 'respondent_email', 'respondent_name',
+    'department', 'created_at', 'completed'
+]
+
+
+class Echo:
+    """File-like object whose write() hands the value back to csv.writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def iter_pivoted_responses(survey, chunk_size):
+    """Yield (response values, {question_id: answer_text}) per response.
+
+    Responses and their answers are read from two server-side cursors
+    ordered by response id and merged as they stream, so only one
+    response's answers are held in memory at a time. Archived responses,
+    whose ids are all lower, come first.
+    """
+    from .archiving import archived_responses, survey_archive  # imports this module
+
+    archive = survey_archive(survey)
+    if archive is not None:
+        yield from archived_responses(archive)
+
+    responses = Response.objects.filter(survey=survey).order_by('id').values_list(
+        *RESPONSE_COLUMNS
+    ).iterator(chunk_size=chunk_size)
+    answers = Answer.objects.filter(response__survey=survey).order_by(
+        'response_id', 'id'
+    ).values_list('response_id', 'question_id', 'answer_text').iterator(chunk_size=chunk_size)
+
+    pending = next(answers, None)
+    for row in responses:
+        response_id = row[0]
+        row_answers = {}
+        while pending is not None and pending[0] <= response_id:
+            if pending[0] == response_id:
+                question_id, answer_text = pending[1], pending[2]
+                if question_id in row_answers:
+                    answer_text = f'{row_answers[question_id]}; {answer_text}'
+                row_answers[question_id] = answer_text
+            pending = next(answers, None)
+        yield row, row_answers
+
+
+def csv_rows(survey, questions, chunk_size):
+    writer = csv.writer(Echo())
+    yield writer.writerow(RESPONSE_COLUMNS + [question.question for question in questions])
+    for row, answers in iter_pivoted_responses(survey, chunk_size):
+        created_at = row[4].isoformat() if row[4] else ''
+        yield writer.writerow(
+            list(row[:4]) + [created_at, row[5]]
+            + [answers.get(question.id, '') for question in questions]
+        )
+
+
+def ndjson_rows(survey, questions, chunk_size):
+    question_ids = [question.id for question in questions]
+    for row, answers in iter_pivoted_responses(survey, chunk_size):
+        record = dict(zip(RESPONSE_COLUMNS, row))
+        record['created_at'] = record['created_at'].isoformat() if record['created_at'] else None
+        record['answers'] = {
+            str(question_id): answers.get(question_id)
+            for question_id in question_ids
+        }
+        yield json.dumps(record) + '\n'
+
+
+def export_responses(survey, output):
+    """Stream all responses to `survey` as CSV or NDJSON, one row per response"""
+    chunk_size = getattr(settings, 'RESPONSE_EXPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    questions = list(survey.questions.all())
+    rows = csv_rows if output == 'csv' else ndjson_rows
+    response = StreamingHttpResponse(
+        rows(survey, questions, chunk_size),
+        content_type=EXPORT_FORMATS[output]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="survey-{survey.id}-responses.{output}"'
+    )
+    return response
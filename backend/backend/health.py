@@ -0,0 +1,63 @@
+"""Health check and database connection instrumentation endpoints"""
+import threading
+import time
+from django.db import connection, DatabaseError
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response as DRFResponse
+
+_lock = threading.Lock()
+connection_stats = {'opened': 0}
+
+
+def record_connection(connection):
+    """Stamp a new (or newly checked out) connection so its age can be reported"""
+    connection.connected_at = time.monotonic()
+    with _lock:
+        connection_stats['opened'] += 1
+
+
+def connection_age(connection):
+    connected_at = getattr(connection, 'connected_at', None)
+    if connection.connection is None or connected_at is None:
+        return None
+    return round(time.monotonic() - connected_at, 3)
+
+
+@api_view(['GET'])
+def health(request):
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except DatabaseError as e:
+        return DRFResponse(
+            {'status': 'error', 'database': str(e)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    return DRFResponse({
+        'status': 'ok',
+        'database': 'ok',
+        'latencyMs': round((time.perf_counter() - started) * 1000, 3),
+    })
+
+
+@api_view(['GET'])
+def database_stats(request):
+    """Connection reuse settings, connection age and, when pooled, pool counters.
+
+    Pool stats come from psycopg_pool (pool_size, pool_available,
+    requests_waiting, requests_wait_ms, ...). Without a pool, connections
+    are persistent per worker thread for CONN_MAX_AGE seconds.
+    """
+    connection.ensure_connection()
+    pool = getattr(connection, 'pool', None)
+    return DRFResponse({
+        'vendor': connection.vendor,
+        'connMaxAge': connection.settings_dict['CONN_MAX_AGE'],
+        'healthChecks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+        'connectionsOpened': connection_stats['opened'],
+        'connectionAgeSeconds': connection_age(connection),
+        'pool': pool.get_stats() if pool is not None else None,
+    })
@@ -0,0 +1,159 @@
+import codecs
+import csv
+import json
+import time
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+from .models import Response
+from .serializers import ResponseCreateSerializer
+from .dedupe import find_duplicates
+from .submissions import save_submissions
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+
+def import_batch_size(requested=None, setting='RESPONDENT_IMPORT_BATCH_SIZE'):
+    """Batch size from the request, falling back to the given setting"""
+    if requested:
+        batch_size = int(requested)
+        if batch_size < 1:
+            raise ValueError('batch_size must be a positive integer')
+        return batch_size
+    return getattr(settings, setting, DEFAULT_BATCH_SIZE)
+
+
+def clean_respondent(row):
+    """Validate a CSV row; returns Response field values or None to reject it"""
+    email = (row.get('email') or '').strip() or None
+    name = (row.get('name') or '').strip() or None
+    department = (row.get('department') or '').strip() or None
+
+    if not (email or name or department):
+        return None
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            return None
+    if (name and len(name) > 200) or (department and len(department) > 200):
+        return None
+    return {'respondent_email': email, 'respondent_name': name, 'department': department}
+
+
+def import_respondents(survey, uploaded_file, batch_size):
+    """Stream respondents from a CSV upload into `survey` in bulk batches.
+
+    The file is decoded line by line so memory stays bounded by the batch
+    size. All batches share one transaction, so a malformed file imports
+    nothing. Returns a dict of imported/rejected row counts and elapsed time.
+    """
+    started = time.perf_counter()
+    imported = rejected = 0
+    batch = []
+
+    reader = csv.DictReader(codecs.iterdecode(uploaded_file, 'utf-8-sig'))
+    with transaction.atomic():
+        for row in reader:
+            values = clean_respondent(row)
+            if values is None:
+                rejected += 1
+                continue
+            batch.append(Response(survey=survey, **values))
+            if len(batch) >= batch_size:
+                Response.objects.bulk_create(batch)
+                imported += len(batch)
+                batch = []
+        if batch:
+            Response.objects.bulk_create(batch)
+            imported += len(batch)
+
+    return {
+        'imported': imported,
+        'rejected': rejected,
+        'elapsed': round(time.perf_counter() - started, 3),
+    }
+
+
+def import_responses(survey, lines, batch_size):
+    """Validate NDJSON submissions for `survey` and insert them in batches.
+
+    `lines` yields one JSON submission per line (the ResponseCreateSerializer
+    payload; `survey` may be omitted). Records are validated against the
+    survey's questions, loaded once, so answers to other surveys' questions
+    are rejected. Each batch of valid records is written by save_submissions
+    in its own transaction, so a failing batch does not undo earlier ones.
+    Returns counts, per-line errors (the first MAX_REPORTED_ERRORS) and
+    throughput.
+    """
+    started = time.perf_counter()
+    context = {
+        'surveys': {survey.id: survey},
+        'questions': survey.questions.prefetch_related('options').in_bulk(),
+    }
+    # One serializer validates every record, as ListSerializer does with its
+    # child, so DRF builds the field tree once instead of per record
+    validator = ResponseCreateSerializer(context=context)
+    counts = {'imported': 0, 'rejected': 0, 'batches': 0}
+    errors = []
+    batch = []
+
+    def reject(line_number, detail):
+        counts['rejected'] += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'line': line_number, 'errors': detail})
+
+    def flush():
+        if not batch:
+            return
+        duplicates = find_duplicates([data for _, data in batch])
+        for (line_number, _), duplicate in zip(batch, duplicates):
+            if duplicate:
+                reject(line_number, {'detail': 'Duplicate submission'})
+        batch[:] = [item for item, duplicate in zip(batch, duplicates) if not duplicate]
+        try:
+            with transaction.atomic():
+                save_submissions([data for _, data in batch])
+        except DatabaseError as e:
+            for line_number, _ in batch:
+                reject(line_number, {'detail': f'Database error: {e}'})
+        else:
+            counts['imported'] += len(batch)
+        counts['batches'] += 1
+        batch.clear()
+
+    for line_number, line in enumerate(lines, start=1):
+        try:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8-sig')
+            if not line.strip():
+                continue
+            record = json.loads(line)
+        except ValueError:
+            reject(line_number, {'detail': 'Invalid JSON'})
+            continue
+        if not isinstance(record, dict):
+            reject(line_number, {'detail': 'Expected a JSON object'})
+            continue
+
+        record.setdefault('survey', survey.id)
+        try:
+            validated_data = validator.run_validation(record)
+        except serializers.ValidationError as exc:
+            reject(line_number, serializers.as_serializer_error(exc))
+            continue
+        batch.append((line_number, validated_data))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        **counts,
+        'errors': errors,
+        'elapsed': round(elapsed, 3),
+        'records_per_second': round((counts['imported'] + counts['rejected']) / elapsed, 1) if elapsed else 0,
+    }
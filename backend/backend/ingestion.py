@@ -0,0 +1,86 @@
+import json
+from django.db import DatabaseError, transaction
+from django.db.models import Min
+from django.utils import timezone
+from .models import Survey, PendingSubmission
+from .dedupe import find_duplicates
+from .serializers import ResponseCreateSerializer
+from .submissions import answered_question_ids, preload_questions, save_submissions
+
+
+def queue_submission(payload):
+    """Append a shape-validated submission to the outbox"""
+    return PendingSubmission.objects.create(payload=payload)
+
+
+def drain_batch(batch_size, max_attempts):
+    """Validate and insert up to `batch_size` queued submissions.
+
+    Surveys and questions for the whole batch are loaded once, valid
+    submissions are written with a single bulk insert and removed from the
+    outbox. Invalid payloads and duplicates (see dedupe.py) are marked
+    failed immediately; database errors leave the rows queued for retry
+    until `max_attempts` is reached.
+    Returns (inserted, rejected, retried) counts.
+    """
+    with transaction.atomic():
+        pending = list(
+            PendingSubmission.objects.select_for_update(skip_locked=True)
+            .filter(failed=False)[:batch_size]
+        )
+        if not pending:
+            return 0, 0, 0
+
+        payloads = [row.payload for row in pending]
+        context = {
+            'questions': preload_questions(answered_question_ids(payloads)),
+            'surveys': Survey.objects.in_bulk({payload['survey'] for payload in payloads}),
+        }
+        valid, changed = [], []
+        for row in pending:
+            serializer = ResponseCreateSerializer(data=row.payload, context=context)
+            if serializer.is_valid():
+                valid.append((row, serializer.validated_data))
+            else:
+                row.attempts += 1
+                row.failed = True
+                row.last_error = json.dumps(serializer.errors)
+                changed.append(row)
+        duplicates = find_duplicates([data for _, data in valid])
+        for (row, _), duplicate in zip(valid, duplicates):
+            if duplicate:
+                row.attempts += 1
+                row.failed = True
+                row.last_error = 'Duplicate submission'
+                changed.append(row)
+        valid = [item for item, duplicate in zip(valid, duplicates) if not duplicate]
+        rejected = len(changed)
+
+        inserted = 0
+        if valid:
+            try:
+                with transaction.atomic():
+                    save_submissions([data for _, data in valid])
+            except DatabaseError as e:
+                for row, _ in valid:
+                    row.attempts += 1
+                    row.last_error = str(e)
+                    row.failed = row.attempts >= max_attempts
+                    changed.append(row)
+            else:
+                PendingSubmission.objects.filter(id__in=[row.id for row, _ in valid]).delete()
+                inserted = len(valid)
+
+        PendingSubmission.objects.bulk_update(changed, ['attempts', 'failed', 'last_error'])
+        return inserted, rejected, len(changed) - rejected
+
+
+def queue_stats():
+    """Backlog depth, failed count and age of the oldest queued submission"""
+    backlog = PendingSubmission.objects.filter(failed=False)
+    oldest = backlog.aggregate(oldest=Min('created_at'))['oldest']
+    return {
+        'backlog': backlog.count(),
+        'failed': PendingSubmission.objects.filter(failed=True).count(),
+        'oldest_age_seconds': (timezone.now() - oldest).total_seconds() if oldest else 0,
+    }
@@ -0,0 +1,273 @@
+"""Per-request SQL and timing instrumentation.
+
+RequestMetricsMiddleware samples REQUEST_METRICS_SAMPLE_RATE of requests.
+For a sampled request it times every statement on every database alias,
+adds a Server-Timing header and folds the numbers into per-action
+histograms, which /api/metrics/ exposes in the Prometheus text format.
+Metrics live in process memory, so each worker reports its own.
+
+The metrics endpoints show view names and SQL, so they are limited to
+staff users and to scrapers sending `Authorization: Bearer <METRICS_TOKEN>`.
+"""
+import bisect
+import heapq
+import hmac
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response as DRFResponse
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+MAX_SQL_LENGTH = 500
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs ending with +Inf"""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+        yield '+Inf', self.count
+
+
+class SlowestQueries:
+    """Keeps the `size` slowest (seconds, sql) pairs seen"""
+
+    def __init__(self, size):
+        self.size = size
+        self.heap = []
+
+    def add(self, seconds, sql):
+        if len(self.heap) < self.size:
+            heapq.heappush(self.heap, (seconds, sql))
+        elif seconds > self.heap[0][0]:
+            heapq.heapreplace(self.heap, (seconds, sql))
+
+    def merge(self, other):
+        for seconds, sql in other.heap:
+            self.add(seconds, sql)
+
+    def ordered(self):
+        return sorted(self.heap, reverse=True)
+
+
+class ActionMetrics:
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.sql_duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.slowest = SlowestQueries(settings.REQUEST_METRICS_SLOWEST_QUERIES)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.actions = {}
+
+    def record(self, action, duration, timer):
+        with self.lock:
+            metrics = self.actions.get(action)
+            if metrics is None:
+                metrics = self.actions[action] = ActionMetrics()
+            metrics.duration.observe(duration)
+            metrics.sql_duration.observe(timer.duration)
+            metrics.queries.observe(timer.count)
+            metrics.slowest.merge(timer.slowest)
+
+
+registry = MetricsRegistry()
+
+
+class QueryTimer:
+    """Counts and times the statements run for one sampled request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+        self.slowest = SlowestQueries(settings.REQUEST_METRICS_SLOWEST_QUERIES)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            self.slowest.add(elapsed, sql[:MAX_SQL_LENGTH])
+
+
+# Context variables follow the request into sync_to_async threads, where
+# async views run their queries on that thread's connection
+current_timer = ContextVar('request_metrics_timer', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def instrument_connection(connection):
+    """Install time_query on a database connection (once per wrapper object)"""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def action_name(request):
+    """'SurveyViewSet.results' for viewset actions, else the URL name"""
+    match = request.resolver_match
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'cls', None)
+    actions = getattr(match.func, 'actions', None)
+    if view_class is not None and actions:
+        method = request.method.lower()
+        return f'{view_class.__name__}.{actions.get(method, method)}'
+    return match.view_name or match.func.__name__
+
+
+def server_timing(timer, duration):
+    return (
+        f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries", '
+        f'view;dur={duration * 1000:.1f}'
+    )
+
+
+class RequestMetricsMiddleware:
+    """Records query count, SQL time, slowest queries and view time per action.
+
+    Keep it last in MIDDLEWARE so the measured time is the view's own.
+    Bodies of streaming responses are produced after the view returns and
+    are not included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def finish(self, request, response, timer, duration):
+        action = action_name(request)
+        registry.record(action, duration, timer)
+        response['Server-Timing'] = server_timing(timer, duration)
+        logger.debug(
+            '%s %s: %d queries, %.1f ms SQL, %.1f ms total',
+            request.method, action, timer.count, timer.duration * 1000, duration * 1000
+        )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        timer = QueryTimer()
+        token = current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.finish(request, response, timer, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        timer = QueryTimer()
+        token = current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.finish(request, response, timer, time.perf_counter() - started)
+
+
+def prometheus_text(actions):
+    lines = [
+        '# HELP request_metrics_sample_rate Fraction of requests that are instrumented',
+        '# TYPE request_metrics_sample_rate gauge',
+        f'request_metrics_sample_rate {settings.REQUEST_METRICS_SAMPLE_RATE}',
+    ]
+    families = [
+        ('http_request_duration_seconds', 'View wall time per action', 'duration'),
+        ('http_request_sql_duration_seconds', 'Total SQL time per request and action', 'sql_duration'),
+        ('http_request_sql_queries', 'SQL statements per request and action', 'queries'),
+    ]
+    for name, help_text, attribute in families:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for action, action_metrics in sorted(actions.items()):
+            histogram = getattr(action_metrics, attribute)
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{action="{action}",le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{action="{action}"}} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{{action="{action}"}} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+
+class CanReadMetrics(BasePermission):
+    """Staff users, or requests carrying the METRICS_TOKEN bearer token"""
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        token = settings.METRICS_TOKEN
+        if not token:
+            return False
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode())
+
+
+@api_view(['GET'])
+@permission_classes([CanReadMetrics])
+def metrics(request):
+    with registry.lock:
+        body = prometheus_text(registry.actions)
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@api_view(['GET'])
+@permission_classes([CanReadMetrics])
+def slow_queries(request):
+    """The slowest sampled statements per action, slowest first"""
+    with registry.lock:
+        data = {
+            action: [
+                {'ms': round(seconds * 1000, 3), 'sql': sql}
+                for seconds, sql in action_metrics.slowest.ordered()
+            ]
+            for action, action_metrics in sorted(registry.actions.items())
+        }
+    return DRFResponse(data)
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from backend.archiving import ArchiveError, archive_survey, closed_surveys_to_archive
+from backend.importers import import_batch_size
+from backend.models import Survey
+
+class Command(BaseCommand):
+    help = (
+        'Moves the responses and answers of closed surveys into compressed '
+        'archive chunks; results keep working from snapshotted aggregates'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--survey', type=int, action='append', dest='surveys',
+            help='Survey id to archive (repeatable; default: every closed survey not yet archived)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Responses per transaction and chunk (default: ARCHIVE_BATCH_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            batch_size = import_batch_size(options['batch_size'], 'ARCHIVE_BATCH_SIZE')
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['surveys']:
+            surveys = Survey.objects.filter(id__in=options['surveys']).order_by('id')
+            missing = set(options['surveys']) - {survey.id for survey in surveys}
+            if missing:
+                raise CommandError(f"No survey with id {', '.join(map(str, sorted(missing)))}")
+        else:
+            surveys = closed_surveys_to_archive()
+
+        for survey in surveys:
+            try:
+                archive = archive_survey(
+                    survey, batch_size,
+                    progress=lambda chunk: self.stdout.write(
+                        f'  survey {survey.id}: responses {chunk.first_response_id}-{chunk.last_response_id} '
+                        f'({chunk.response_count} responses, {chunk.answer_count} answers)'
+                    )
+                )
+            except ArchiveError as exc:
+                raise CommandError(str(exc))
+            ratio = archive.raw_bytes / archive.compressed_bytes if archive.compressed_bytes else 0
+            self.stdout.write(self.style.SUCCESS(
+                f'Survey {survey.id}: {archive.response_count} responses and {archive.answer_count} answers '
+                f'archived in {archive.chunks.count()} chunks, {archive.compressed_bytes / 1024:.1f} KiB '
+                f'({ratio:.1f}x smaller than the JSON rows)'
+            ))
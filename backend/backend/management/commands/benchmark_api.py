@@ -0,0 +1,124 @@
+import io
+import math
+import statistics
+import tracemalloc
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+from backend.benchmarking import capture_queries, isolated_database, timed
+from backend.models import Response
+from backend.seeding import SurveyGenerator
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the main API endpoints against a throwaway database, '
+        'recording query counts, wall time and peak memory, and fails when '
+        'a query budget is exceeded'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--surveys', type=int, default=20, help='Surveys to seed (default: 20)')
+        parser.add_argument('--questions', type=int, default=20, help='Questions per survey (default: 20)')
+        parser.add_argument('--responses', type=int, default=200, help='Completed responses per survey (default: 200)')
+        parser.add_argument('--respondents', type=int, default=1000, help='Rows in the respondent CSV upload (default: 1000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per endpoint (default: 5)')
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            creator = User.objects.create_superuser(username='bench@example.com')
+            surveys = SurveyGenerator([creator], seed=0).generate(
+                options['surveys'], options['questions'], options['responses']
+            )
+            survey = surveys[0]
+            client = APIClient()
+            rows = options['respondents']
+            batch_size = max(1, min(rows, 5000))
+            # The backend may split each bulk_create batch further (SQLite caps bound parameters)
+            fields = [field for field in Response._meta.concrete_fields if not field.primary_key]
+            insert_batch = min(batch_size, connection.ops.bulk_batch_size(fields, [None] * batch_size))
+
+            cases = self.build_cases(survey, rows, batch_size, insert_batch)
+            failures = []
+            self.stdout.write(
+                f"{'endpoint':<28} {'queries':>8} {'budget':>7} {'median ms':>10} {'peak KiB':>10}"
+            )
+            for name, budget, setup, call in cases:
+                setup()
+                self.check_status(name, call(client))  # warm up
+                query_counts, timings = [], []
+                for _ in range(options['repeat']):
+                    setup()
+                    with capture_queries() as queries:
+                        response, elapsed = timed(call, client)
+                    self.check_status(name, response)
+                    query_counts.append(len(queries))
+                    timings.append(elapsed)
+
+                setup()
+                tracemalloc.start()
+                call(client)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                queries = max(query_counts)
+                if queries > budget:
+                    failures.append(f'{name}: {queries} queries (budget {budget})')
+                self.stdout.write(
+                    f"{name:<28} {queries:>8} {budget:>7} "
+                    f"{statistics.median(timings):>10.2f} {peak / 1024:>10.1f}"
+                )
+
+        if failures:
+            raise CommandError('Query budget exceeded:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('All endpoints within their query budgets'))
+
+    def build_cases(self, survey, rows, batch_size, insert_batch):
+        """(name, query budget, setup, call) for each benchmarked endpoint"""
+        questions = list(survey.questions.all())
+        answer_values = {
+            'multiple_choice': 'Satisfied', 'rating': '8', 'yes_no': 'Yes', 'text': 'Benchmark'
+        }
+        submission = {
+            'survey': survey.id,
+            'respondent_email': 'bench@example.com',
+            'answers': [
+                {'question': question.id, 'answer_text': answer_values[question.type]}
+                for question in questions
+            ],
+        }
+        roster = 'email,name,department\n' + ''.join(
+            f'employee{i}@example.com,Employee {i},Engineering\n' for i in range(rows)
+        )
+
+        def upload(client):
+            upload_file = io.BytesIO(roster.encode())
+            upload_file.name = 'respondents.csv'
+            return client.post(
+                f'/api/surveys/{survey.id}/upload_respondents/?batch_size={batch_size}',
+                {'file': upload_file}
+            )
+
+        def noop():
+            pass
+
+        public_url = f'/api/surveys/{survey.id}/public/{survey.public_link}/'
+        return [
+            ('surveys list', 1, noop, lambda client: client.get('/api/surveys/')),
+            ('surveys list (cursor)', 1, noop, lambda client: client.get('/api/surveys/?page_size=50')),
+            ('surveys retrieve', 3, noop, lambda client: client.get(f'/api/surveys/{survey.id}/')),
+            ('retrieve_public (cold)', 3, cache.clear, lambda client: client.get(public_url)),
+            ('retrieve_public (cached)', 0, noop, lambda client: client.get(public_url)),
+            ('results', 4, noop, lambda client: client.get(f'/api/surveys/{survey.id}/results/')),
+            ('responses list', 2, noop, lambda client: client.get('/api/responses/')),
+            ('responses create', 10, noop, lambda client: client.post('/api/responses/', submission, format='json')),
+            ('upload_respondents', 3 + math.ceil(rows / insert_batch), noop, upload),
+        ] + [
+            ('text answers page', 2, noop, lambda client: client.get(f'/api/questions/{question.id}/answers/'))
+            for question in questions[:4] if question.type == 'text'
+        ]
+
+    def check_status(self, name, response):
+        if response.status_code >= 400:
+            raise CommandError(f'{name} returned {response.status_code}: {response.content[:200]!r}')
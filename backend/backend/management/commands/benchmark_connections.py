@@ -0,0 +1,90 @@
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.core.signals import request_started, request_finished
+from django.db import connections
+from backend.benchmarking import percentile
+from backend.health import connection_stats
+from backend.models import Survey
+
+
+def simulated_request():
+    """One request's worth of database work, bracketed by the request signals
+    that open and (depending on CONN_MAX_AGE) close the connection"""
+    request_started.send(sender=None)
+    try:
+        list(Survey.objects.order_by('id').values_list('id', flat=True)[:10])
+    finally:
+        request_finished.send(sender=None)
+
+
+def run_requests(count, threads):
+    remaining = [count]
+    lock = threading.Lock()
+    latencies = []
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            started = time.perf_counter()
+            simulated_request()
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+        connections.close_all()
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares request throughput when opening a connection per request, '
+        'reusing persistent connections (CONN_MAX_AGE) and, if configured, '
+        'using the psycopg connection pool'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per mode (default: 2000)')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent worker threads (default: 8)')
+        parser.add_argument(
+            '--max-age', type=int, default=60,
+            help='CONN_MAX_AGE for the persistent mode (default: 60)'
+        )
+
+    def handle(self, *args, **options):
+        db = connections.settings['default']
+        original = (db['CONN_MAX_AGE'], db['OPTIONS'])
+        unpooled = {key: value for key, value in db['OPTIONS'].items() if key != 'pool'}
+
+        modes = [
+            ('connection per request', 0, unpooled),
+            (f'persistent (max age {options["max_age"]}s)', options['max_age'], unpooled),
+        ]
+        if 'pool' in original[1]:
+            modes.append(('psycopg pool', 0, original[1]))
+
+        self.stdout.write(
+            f"{'mode':<32} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'connects':>9}"
+        )
+        try:
+            for label, max_age, db_options in modes:
+                db['CONN_MAX_AGE'], db['OPTIONS'] = max_age, db_options
+                connections.close_all()
+                opened = connection_stats['opened']
+                latencies, elapsed = run_requests(options['requests'], options['threads'])
+                self.stdout.write(
+                    f"{label:<32} {len(latencies) / elapsed:>8.0f} "
+                    f"{percentile(latencies, 50):>8.2f} {percentile(latencies, 99):>8.2f} "
+                    f"{connection_stats['opened'] - opened:>9}"
+                )
+        finally:
+            db['CONN_MAX_AGE'], db['OPTIONS'] = original
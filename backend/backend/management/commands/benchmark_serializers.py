@@ -0,0 +1,77 @@
+import statistics
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from backend.benchmarking import capture_queries, isolated_database, timed
+from backend.models import Survey, Response
+from backend.payloads import public_survey_payload, response_payloads
+from backend.renderers import ORJSONRenderer
+from backend.seeding import SurveyGenerator
+from backend.serializers import ResponseSerializer, SurveyResponseSerializer
+
+class Command(BaseCommand):
+    help = (
+        'Compares DRF serializers with the .values() payloads and orjson renderer '
+        'for the public survey and response list, in objects per second, and '
+        'fails if the rendered bytes differ'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=40, help='Questions in the survey (default: 40)')
+        parser.add_argument('--responses', type=int, default=1000, help='Completed responses (default: 1000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per path (default: 5)')
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            creator = User.objects.create_user(username='bench@example.com')
+            survey = SurveyGenerator([creator], seed=0).generate(1, options['questions'], options['responses'])[0]
+
+            def serializer_survey():
+                instance = Survey.objects.prefetch_related('questions__options').get(
+                    id=survey.id, public_link=survey.public_link, status='active'
+                )
+                return JSONRenderer().render(SurveyResponseSerializer(instance).data)
+
+            def payload_survey():
+                return ORJSONRenderer().render(public_survey_payload(survey.id, survey.public_link))
+
+            def serializer_responses():
+                # Prefetched, unlike the N+1 the list view used to run, so only serializing differs
+                responses = Response.objects.filter(survey=survey).prefetch_related('answers')
+                return JSONRenderer().render(ResponseSerializer(responses, many=True).data)
+
+            def payload_responses():
+                return ORJSONRenderer().render(response_payloads(Response.objects.filter(survey=survey)))
+
+            survey_objects = 1 + survey.questions.count() + sum(
+                question.options.count() for question in survey.questions.all()
+            )
+            response_objects = Response.objects.filter(survey=survey).count() + sum(
+                response.answers.count() for response in Response.objects.filter(survey=survey)
+            )
+            cases = [
+                ('public survey', survey_objects, serializer_survey, payload_survey),
+                ('response list', response_objects, serializer_responses, payload_responses),
+            ]
+
+            self.stdout.write(
+                f"{'payload':<16} {'path':<12} {'objects':>8} {'queries':>8} "
+                f"{'median ms':>10} {'objects/s':>12}"
+            )
+            for name, objects, before, after in cases:
+                if before() != after():
+                    raise CommandError(f'{name}: rendered bytes differ between the two paths')
+                medians = []
+                for path, render in (('serializer', before), ('values', after)):
+                    timings = []
+                    for _ in range(options['repeat']):
+                        with capture_queries() as queries:
+                            _, elapsed = timed(render)
+                        timings.append(elapsed)
+                    median = statistics.median(timings)
+                    medians.append(median)
+                    self.stdout.write(
+                        f"{name:<16} {path:<12} {objects:>8} {len(queries):>8} "
+                        f"{median:>10.2f} {objects / (median / 1000):>12,.0f}"
+                    )
+                self.stdout.write(f'{name}: {medians[0] / medians[1]:.1f}x faster, identical bytes')
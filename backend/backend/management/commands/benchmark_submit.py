@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIClient
+from backend.benchmarking import isolated_database, percentile, timed
+from backend.models import Survey, Question, QuestionOption
+
+QUESTION_TYPES = ['multiple_choice', 'rating', 'yes_no', 'text']
+
+class Command(BaseCommand):
+    help = 'Measures p50/p99 response submission latency against answer count'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--answers', default='1,10,20,40',
+            help='Comma-separated answer counts to benchmark (default: 1,10,20,40)'
+        )
+        parser.add_argument(
+            '--iterations', type=int, default=100,
+            help='Submissions per answer count (default: 100)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            answer_counts = [int(n) for n in options['answers'].split(',')]
+        except ValueError:
+            raise CommandError('--answers must be a comma-separated list of integers')
+
+        with isolated_database():
+            client = APIClient()
+            creator = User.objects.create_user(username='bench@example.com')
+
+            self.stdout.write(f"{'answers':>8} {'p50 ms':>10} {'p99 ms':>10}")
+            for count in answer_counts:
+                payload = self.build_payload(creator, count)
+                latencies = []
+                for i in range(options['iterations']):
+                    payload['respondent_email'] = f'respondent{i}@example.com'
+                    response, elapsed = timed(client.post, '/api/responses/', payload, format='json')
+                    if response.status_code != 201:
+                        raise CommandError(f'Submission failed: {response.content!r}')
+                    latencies.append(elapsed)
+
+                self.stdout.write(
+                    f"{count:>8} {percentile(latencies, 50):>10.2f} {percentile(latencies, 99):>10.2f}"
+                )
+
+    def build_payload(self, creator, count):
+        survey = Survey.objects.create(
+            creator=creator,
+            title=f'Benchmark survey ({count} questions)',
+            status='active'
+        )
+        answers = []
+        for order in range(count):
+            question_type = QUESTION_TYPES[order % len(QUESTION_TYPES)]
+            question = Question.objects.create(
+                survey=survey,
+                type=question_type,
+                question=f'Question {order}',
+                order=order
+            )
+            if question_type == 'multiple_choice':
+                QuestionOption.objects.create(question=question, text='Option A', order=0)
+                answer_text = 'Option A'
+            elif question_type == 'rating':
+                answer_text = '7'
+            elif question_type == 'yes_no':
+                answer_text = 'Yes'
+            else:
+                answer_text = 'Benchmark feedback text.'
+            answers.append({'question': question.id, 'answer_text': answer_text})
+
+        return {'survey': survey.id, 'answers': answers}
@@ -0,0 +1,51 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from backend.ingestion import drain_batch, queue_stats
+
+class Command(BaseCommand):
+    help = 'Drains queued response submissions into the database in bulk batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Submissions per batch (default: 500)')
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='Failed inserts before a submission is parked as failed (default: 5)'
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new submissions')
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to wait when the queue is empty in --loop mode (default: 1.0)'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        started = time.perf_counter()
+        total = 0
+        try:
+            while True:
+                batch_started = time.perf_counter()
+                inserted, rejected, retried = drain_batch(options['batch_size'], options['max_attempts'])
+                elapsed = time.perf_counter() - batch_started
+
+                if inserted or rejected or retried:
+                    total += inserted
+                    stats = queue_stats()
+                    self.stdout.write(
+                        f"inserted={inserted} rejected={rejected} retried={retried} "
+                        f"rate={inserted / elapsed:.0f}/s backlog={stats['backlog']} "
+                        f"failed={stats['failed']} oldest={stats['oldest_age_seconds']:.1f}s"
+                    )
+                    continue
+
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Drained {total} submissions in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f}/s)'
+        ))
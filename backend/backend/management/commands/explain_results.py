@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from backend.models import Survey
+from backend.results import completed_responses, text_answers
+from backend.tallies import answer_count_rows, typed_answer_rows, untyped_answer_rows
+
+class Command(BaseCommand):
+    help = (
+        'Prints EXPLAIN plans for the results queries and, on Postgres, checks '
+        'that each one is served by its index'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('survey', type=int, help='Survey id to explain the queries for')
+
+    def handle(self, *args, **options):
+        try:
+            survey = Survey.objects.get(id=options['survey'])
+        except Survey.DoesNotExist:
+            raise CommandError(f"Survey {options['survey']} does not exist")
+
+        question_ids = list(survey.questions.values_list('id', flat=True))
+        # (label, queryset, index expected in the plan or None for any index, index-only scan expected)
+        # Index-only checks must select indexed columns only: survey_results counts
+        # completed responses with COUNT(*), explained here grouped by the one survey
+        checks = [
+            ('completed response count',
+             completed_responses(survey).values('survey').annotate(count=Count('*')).order_by(),
+             'response_completed_idx', True),
+            ('tally rebuild (typed answers)', typed_answer_rows(question_ids),
+             'answer_typed_idx', False),
+            ('tally rebuild (untyped answers)', untyped_answer_rows(question_ids),
+             'answer_typed_idx', False),
+            # Served by the auto-named index Django adds for the question foreign key
+            ('tally rebuild (answer counts)', answer_count_rows(question_ids), None, False),
+        ]
+        text_question = survey.questions.filter(type='text').first()
+        if text_question is not None:
+            checks.append(
+                ('text answer search', text_answers(text_question, 'service'),
+                 'answer_text_trgm_idx', False)
+            )
+
+        postgres = connection.vendor == 'postgresql'
+        failures = []
+        for label, queryset, index, index_only in checks:
+            with transaction.atomic():
+                if postgres:
+                    # Tiny tables make seq scans cheapest; verify the index path exists
+                    with connection.cursor() as cursor:
+                        cursor.execute('SET LOCAL enable_seqscan = off')
+                plan = queryset.explain()
+
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(plan)
+            if not postgres:
+                continue
+            if index is None:
+                table = queryset.model._meta.db_table
+                if f'Seq Scan on {table}' in plan:
+                    failures.append(f'{label}: expected an index scan of {table}')
+                continue
+            # Bitmap scans name the index as "on <index>", other scans as "using <index>"
+            scan = f'Index Only Scan using {index}' if index_only else f' {index}'
+            if scan not in plan:
+                failures.append(f'{label}: expected "{scan}"')
+
+        if not postgres:
+            self.stdout.write(self.style.WARNING(
+                f'Index checks only run on PostgreSQL (current backend: {connection.vendor})'
+            ))
+        elif failures:
+            raise CommandError('Results queries are not using their indexes:\n  ' + '\n  '.join(failures))
+        else:
+            self.stdout.write(self.style.SUCCESS('All results queries use their indexes'))
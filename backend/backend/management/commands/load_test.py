@@ -0,0 +1,133 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand, CommandError
+from backend.benchmarking import percentile
+
+
+async def http_request(reader, writer, method, target, host, body):
+    """Send one HTTP/1.1 request on a keep-alive connection; returns the status code"""
+    headers = [
+        f'{method} {target} HTTP/1.1',
+        f'Host: {host}',
+        'Connection: keep-alive',
+    ]
+    if body is not None:
+        headers += ['Content-Type: application/json', f'Content-Length: {len(body)}']
+    writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode() + (body or b''))
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by server')
+    status = int(status_line.split()[1])
+    length, close = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection' and value.strip().lower() == 'close':
+            close = True
+    if length:
+        await reader.readexactly(length)
+    elif close:
+        await reader.read()
+    return status, close
+
+
+async def run_client(url, method, body, deadline_requests, latencies, errors, think_time):
+    parts = urlsplit(url)
+    target = parts.path + (f'?{parts.query}' if parts.query else '')
+    host = parts.hostname
+    port = parts.port or 80
+    reader = writer = None
+
+    while deadline_requests():
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            started = time.perf_counter()
+            status, close = await http_request(reader, writer, method, target, parts.netloc, body)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status >= 400:
+                errors.append(status)
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError) as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+        if think_time:
+            # Simulate slow clients that hold their connection between requests
+            await asyncio.sleep(think_time)
+
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(url, method, body, concurrency, requests, think_time):
+    remaining = [requests]
+
+    def take():
+        if remaining[0] <= 0:
+            return False
+        remaining[0] -= 1
+        return True
+
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        run_client(url, method, body, take, latencies, errors, think_time)
+        for _ in range(concurrency)
+    ])
+    return latencies, errors, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        'Load tests one or more running endpoints (for example the WSGI and '
+        'ASGI variants) and reports requests/sec and tail latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Full URLs to test, e.g. http://localhost:8000/api/...')
+        parser.add_argument('--concurrency', type=int, default=100, help='Concurrent connections (default: 100)')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per URL (default: 2000)')
+        parser.add_argument('--post', metavar='FILE', help='POST the JSON in FILE instead of issuing GETs')
+        parser.add_argument(
+            '--think-time', type=float, default=0.0,
+            help='Seconds each client idles between requests, to mimic slow mobile clients'
+        )
+
+    def handle(self, *args, **options):
+        body = None
+        method = 'GET'
+        if options['post']:
+            try:
+                with open(options['post'], 'rb') as f:
+                    body = json.dumps(json.load(f)).encode()
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not read {options["post"]}: {e}')
+            method = 'POST'
+
+        self.stdout.write(
+            f"{'url':<60} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        for url in options['urls']:
+            if urlsplit(url).scheme != 'http':
+                raise CommandError(f'Only http:// URLs are supported: {url}')
+            latencies, errors, elapsed = asyncio.run(run_load(
+                url, method, body, options['concurrency'], options['requests'], options['think_time']
+            ))
+            self.stdout.write(
+                f"{url[-60:]:<60} {len(latencies) / elapsed:>8.0f} "
+                f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} "
+                f"{percentile(latencies, 99):>8.1f} {len(errors):>7}"
+            )
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from backend.archiving import survey_archive
+from backend.models import Survey, Question
+from backend.tallies import check_tallies, rebuild_tallies
+
+class Command(BaseCommand):
+    help = 'Rebuilds per-question result tallies from answers and reports drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--survey', type=int, action='append', dest='surveys',
+            help='Only process this survey id (may be repeated)'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Report drift without rewriting the tallies; exits non-zero on drift'
+        )
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.select_related('archive').order_by('id')
+        if options['surveys']:
+            surveys = surveys.filter(id__in=options['surveys'])
+
+        drifted = 0
+        for survey in surveys:
+            if survey_archive(survey) is not None:
+                # Stored tallies are the only record of archived answers
+                self.stdout.write(f"Survey {survey.id}: archived, tallies left as stored")
+                continue
+            questions = Question.objects.filter(survey=survey)
+            drift = check_tallies(questions)
+            for question, field, stored, actual in drift:
+                self.stdout.write(
+                    f"Survey {survey.id} question {question.id}: "
+                    f"{field} is {stored!r}, expected {actual!r}"
+                )
+            drifted += len(drift)
+
+            if not options['check']:
+                rebuild_tallies(questions)
+
+        if options['check']:
+            if drifted:
+                raise CommandError(f'{drifted} tally fields have drifted')
+            self.stdout.write(self.style.SUCCESS('All tallies match their answers'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Successfully rebuilt tallies'))
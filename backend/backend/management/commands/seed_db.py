@@ -1,192 +1,58 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
-from backend.models import Survey, Question, QuestionOption, Response, Answer
-from django.utils import timezone
-import random
+from backend.models import Question
+from backend.seeding import SurveyGenerator
+from backend.tallies import rebuild_tallies
+import time
 
-class Command(BaseCommand):
-    help = 'Seeds the database with sample data'
-
-    def handle(self, *args, **kwargs):
-        # Create test users
-        users = [
-            User.objects.create_user(
-                username='demo@example.com',
-                email='demo@example.com',
-                password='demo1234',
-                first_name='Demo',
-                last_name='User'
-            ),
-            User.objects.create_user(
-                username='test@example.com',
-                email='test@example.com',
-                password='test1234',
-                first_name='Test',
-                last_name='User'
-            )
-        ]
-
-        # Create surveys
-        surveys = [
-            Survey.objects.create(
-                creator=users[0],
-                title="Customer Satisfaction Survey",
-                description="Help us improve our services by sharing your experience",
-                status='active',
-                public_link='cs-survey-2024'
-            ),
-            Survey.objects.create(
-                creator=users[0],
-                title="Employee Engagement Survey",
-                description="Annual employee feedback survey",
-                status='active',
-                public_link='emp-survey-2024'
-            ),
-            Survey.objects.create(
-                creator=users[1],
-                title="Product Feedback Survey",
-                description="Share your thoughts on our new product",
-                status='draft',
-                public_link='product-feedback'
-            )
-        ]
-
-        # Questions for Customer Satisfaction Survey
-        cs_questions = [
-            Question.objects.create(
-                survey=surveys[0],
-                type='multiple_choice',
-                question="How satisfied are you with our service?",
-                required=True,
-                order=1
-            ),
-            Question.objects.create(
-                survey=surveys[0],
-                type='rating',
-                question="How likely are you to recommend our service to others?",
-                required=True,
-                order=2
-            ),
-            Question.objects.create(
-                survey=surveys[0],
-                type='text',
-                question="What improvements would you suggest for our service?",
-                required=False,
-                order=3
-            )
-        ]
-
-        # Options for multiple choice question
-        satisfaction_options = [
-            "Very satisfied",
-            "Satisfied",
-            "Neutral",
-            "Dissatisfied",
-            "Very dissatisfied"
-        ]
-
-        for idx, option in enumerate(satisfaction_options):
-            QuestionOption.objects.create(
-                question=cs_questions[0],
-                text=option,
-                order=idx
-            )
-
-        # Questions for Employee Engagement Survey
-        emp_questions = [
-            Question.objects.create(
-                survey=surveys[1],
-                type='multiple_choice',
-                question="How satisfied are you with your current role?",
-                required=True,
-                order=1
-            ),
-            Question.objects.create(
-                survey=surveys[1],
-                type='multiple_choice',
-                question="How would you rate your work-life balance?",
-                required=True,
-                order=2
-            ),
-            Question.objects.create(
-                survey=surveys[1],
-                type='rating',
-                question="How likely are you to be working here in two years?",
-                required=True,
-                order=3
-            ),
-            Question.objects.create(
-                survey=surveys[1],
-                type='text',
-                question="What would make this company a better place to work?",
-                required=False,
-                order=4
-            )
-        ]
+DEMO_USERS = [
+    ('demo@example.com', 'demo1234', 'Demo'),
+    ('test@example.com', 'test1234', 'Test'),
+]
 
-        # Create sample responses
-        departments = ["Sales", "Marketing", "Engineering", "Customer Support", "HR"]
-        
-        # Generate 50 responses for Customer Satisfaction Survey
-        for i in range(50):
-            response = Response.objects.create(
-                survey=surveys[0],
-                respondent_email=f"respondent{i}@example.com",
-                respondent_name=f"Respondent {i}",
-                department=random.choice(departments),
-                completed=True
-            )
-
-            # Multiple choice answer
-            Answer.objects.create(
-                response=response,
-                question=cs_questions[0],
-                answer_text=random.choice(satisfaction_options)
-            )
-
-            # Rating answer
-            Answer.objects.create(
-                response=response,
-                question=cs_questions[1],
-                answer_text=str(random.randint(1, 10))
-            )
-
-            # Text answer
-            Answer.objects.create(
-                response=response,
-                question=cs_questions[2],
-                answer_text="Sample feedback text for improvements."
-            )
-
-        # Generate 30 responses for Employee Engagement Survey
-        for i in range(30):
-            response = Response.objects.create(
-                survey=surveys[1],
-                respondent_email=f"employee{i}@company.com",
-                respondent_name=f"Employee {i}",
-                department=random.choice(departments),
-                completed=True
-            )
-
-            # Add answers for each question
-            for question in emp_questions:
-                if question.type == 'multiple_choice':
-                    Answer.objects.create(
-                        response=response,
-                        question=question,
-                        answer_text=random.choice(satisfaction_options)
-                    )
-                elif question.type == 'rating':
-                    Answer.objects.create(
-                        response=response,
-                        question=question,
-                        answer_text=str(random.randint(1, 10))
-                    )
-                else:  # text
-                    Answer.objects.create(
-                        response=response,
-                        question=question,
-                        answer_text="Sample text feedback from employee."
-                    )
-
-        self.stdout.write(self.style.SUCCESS('Successfully seeded database'))
\ No newline at end of file
+class Command(BaseCommand):
+    help = 'Seeds the database with generated surveys, questions and responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--surveys', type=int, default=3, help='Surveys to create (default: 3)')
+        parser.add_argument('--questions', type=int, default=4, help='Questions per survey (default: 4)')
+        parser.add_argument('--responses', type=int, default=50, help='Completed responses per survey (default: 50)')
+        parser.add_argument('--seed', type=int, help='Random seed for reproducible answers')
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Rows per bulk insert (default: 10000)'
+        )
+        parser.add_argument(
+            '--status', default='active', choices=['draft', 'active', 'closed'],
+            help='Status of the generated surveys (default: active)'
+        )
+
+    def handle(self, *args, **options):
+        for name in ('surveys', 'questions', 'responses'):
+            if options[name] < 0:
+                raise CommandError(f'--{name} must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        users = []
+        for email, password, first_name in DEMO_USERS:
+            user, created = User.objects.get_or_create(
+                username=email,
+                defaults={'email': email, 'first_name': first_name, 'last_name': 'User'}
+            )
+            if created:
+                user.set_password(password)
+                user.save()
+            users.append(user)
+
+        started = time.perf_counter()
+        generator = SurveyGenerator(users, seed=options['seed'], batch_size=options['batch_size'])
+        surveys = generator.generate(
+            options['surveys'], options['questions'], options['responses'], options['status']
+        )
+        rebuild_tallies(Question.objects.filter(survey__in=surveys))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully seeded {len(surveys)} surveys with {options["responses"]} responses each '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('option_counts', models.JSONField(default=dict)),
+                ('rating_histogram', models.JSONField(default=dict)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('answer_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tally', to='backend.question')),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0002_questiontally'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['question', 'response'], name='answer_question_response_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(condition=models.Q(('completed', True)), fields=['survey', 'created_at'], name='response_completed_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0003_results_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='bool_value',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='option',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='answers', to='backend.questionoption'),
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='rating_value',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['question', 'option', 'bool_value', 'rating_value'], name='answer_typed_idx'),
+        ),
+    ]
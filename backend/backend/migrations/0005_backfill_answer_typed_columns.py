@@ -0,0 +1,72 @@
+from collections import defaultdict
+from django.db import migrations, transaction
+from django.db.models import Case, Max, Q, Value, When
+
+from backend.answers import option_ids_by_text, typed_answer_fields
+
+BATCH_SIZE = 50000
+
+
+def backfill_typed_columns(apps, schema_editor):
+    """Fill rating_value/option/bool_value from answer_text in id-range batches.
+
+    Each batch reads its distinct (question, answer_text) pairs, parses them
+    once, and applies the typed values with one CASE update per column.
+    Yes/no tallies are dropped at the end, see below.
+    """
+    Answer = apps.get_model('backend', 'Answer')
+    QuestionOption = apps.get_model('backend', 'QuestionOption')
+    QuestionTally = apps.get_model('backend', 'QuestionTally')
+    answers = Answer.objects.exclude(question__type='text')
+    max_id = Answer.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    option_ids = {}
+
+    for start in range(0, max_id, BATCH_SIZE):
+        batch = answers.filter(id__gt=start, id__lte=start + BATCH_SIZE)
+        pairs = list(batch.values_list('question_id', 'question__type', 'answer_text').distinct())
+        if not pairs:
+            continue
+
+        missing = {
+            question_id for question_id, question_type, _ in pairs
+            if question_type == 'multiple_choice' and question_id not in option_ids
+        }
+        if missing:
+            options = defaultdict(list)
+            for option in QuestionOption.objects.filter(question_id__in=missing).order_by('order', 'id'):
+                options[option.question_id].append(option)
+            for question_id in missing:
+                option_ids[question_id] = option_ids_by_text(options[question_id])
+
+        whens = defaultdict(list)
+        for question_id, question_type, answer_text in pairs:
+            fields = typed_answer_fields(question_type, answer_text, option_ids.get(question_id, {}))
+            for name, value in fields.items():
+                if value is not None:
+                    whens[name].append(
+                        When(Q(question_id=question_id, answer_text=answer_text), then=Value(value))
+                    )
+
+        with transaction.atomic():
+            for name, cases in whens.items():
+                Answer.objects.filter(id__gt=start, id__lte=start + BATCH_SIZE).update(
+                    **{name: Case(*cases, default=None)}
+                )
+
+    # Tallies counted before the backfill key yes/no answers by their raw text
+    # ('yes', 'YES ') where a recount uses the Yes/No labels; results rebuilds
+    # missing tallies on first use
+    QuestionTally.objects.filter(question__type='yes_no').delete()
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own so large tables are not held in one transaction
+    atomic = False
+
+    dependencies = [
+        ('backend', '0004_answer_typed_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_typed_columns, migrations.RunPython.noop),
+    ]
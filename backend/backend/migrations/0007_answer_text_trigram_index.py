@@ -0,0 +1,39 @@
+from django.db import migrations
+
+INDEX_NAME = 'answer_text_trgm_idx'
+
+
+def create_trigram_index(apps, schema_editor):
+    """Trigram index for substring search over text answers (Postgres only).
+
+    The expression matches what `answer_text__icontains` compiles to, and the
+    condition keeps choice, yes/no and rating answers (which have a typed
+    value) out of the index.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON backend_answer '
+        'USING gin ((UPPER(answer_text::text)) gin_trgm_ops) '
+        'WHERE option_id IS NULL AND bool_value IS NULL AND rating_value IS NULL'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('backend', '0006_pendingsubmission'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0007_answer_text_trigram_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_response_id', models.BigIntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('segmented_results', models.JSONField(default=dict)),
+                ('response_count', models.IntegerField(default=0)),
+                ('answer_count', models.IntegerField(default=0)),
+                ('raw_bytes', models.BigIntegerField(default=0)),
+                ('compressed_bytes', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('survey', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='backend.survey')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchiveChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_response_id', models.BigIntegerField()),
+                ('last_response_id', models.BigIntegerField()),
+                ('response_count', models.IntegerField()),
+                ('answer_count', models.IntegerField()),
+                ('data', models.BinaryField()),
+                ('archive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='backend.surveyarchive')),
+            ],
+            options={
+                'ordering': ['first_response_id'],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_survey_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='response',
+            name='dedupe_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='unique_respondents',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddConstraint(
+            model_name='response',
+            constraint=models.UniqueConstraint(condition=models.Q(('dedupe_key__isnull', False)), fields=('survey', 'dedupe_key'), name='response_dedupe_key_uniq'),
+        ),
+    ]
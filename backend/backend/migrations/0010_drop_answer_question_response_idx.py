@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:16
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_response_dedupe'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='answer',
+            name='answer_question_response_idx',
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:21
+
+import backend.models
+from django.db import migrations, models, transaction
+from django.db.models import Max
+from django.db.models.functions import Random
+
+BATCH_SIZE = 50000
+
+
+def backfill_sample_keys(apps, schema_editor):
+    """Draw a random sample_key per existing response, in id-range batches.
+
+    AddField stores one default value in every existing row, which would
+    make the sample of an existing survey its oldest responses.
+    """
+    Response = apps.get_model('backend', 'Response')
+    max_id = Response.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    for start in range(0, max_id, BATCH_SIZE):
+        with transaction.atomic():
+            Response.objects.filter(id__gt=start, id__lte=start + BATCH_SIZE).update(sample_key=Random())
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own so large tables are not held in one transaction
+    atomic = False
+
+    dependencies = [
+        ('backend', '0010_drop_answer_question_response_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='response',
+            name='sample_key',
+            field=models.FloatField(default=backend.models.new_sample_key),
+        ),
+        migrations.RunPython(backfill_sample_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(condition=models.Q(('completed', True)), fields=['survey', 'sample_key'], name='response_sample_idx'),
+        ),
+    ]
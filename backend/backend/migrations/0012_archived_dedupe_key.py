@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0011_response_sample_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedDedupeKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dedupe_key', models.CharField(max_length=64)),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_dedupe_keys', to='backend.survey')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('survey', 'dedupe_key'), name='archived_dedupe_key_uniq')],
+            },
+        ),
+    ]
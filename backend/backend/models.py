@@ -1,3 +1,4 @@
+import random
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -15,6 +16,8 @@ class Survey(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     public_link = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    # Accept one response per respondent email, see dedupe.py
+    unique_respondents = models.BooleanField(default=False)
 
     def __str__(self):
         return self.title
@@ -51,6 +54,9 @@ class QuestionOption(models.Model):
     def __str__(self):
         return self.text
 
+def new_sample_key():
+    return random.random()
+
 class Response(models.Model):
     survey = models.ForeignKey(Survey, related_name='responses', on_delete=models.CASCADE)
     respondent_email = models.EmailField(null=True, blank=True)
@@ -58,6 +64,33 @@ class Response(models.Model):
     department = models.CharField(max_length=200, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     completed = models.BooleanField(default=False)
+    # SHA-256 of the respondent email or idempotency key of a submission, see dedupe.py
+    dedupe_key = models.CharField(max_length=64, null=True, blank=True)
+    # Uniform random key drawn on insert; the lowest keys form a random sample, see sampling.py
+    sample_key = models.FloatField(default=new_sample_key)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['survey', 'dedupe_key'],
+                condition=models.Q(dedupe_key__isnull=False),
+                name='response_dedupe_key_uniq'
+            ),
+        ]
+        indexes = [
+            # Completed-response counts and date buckets per survey
+            models.Index(
+                fields=['survey', 'created_at'],
+                condition=models.Q(completed=True),
+                name='response_completed_idx'
+            ),
+            # Approximate results read the lowest sample keys of a survey
+            models.Index(
+                fields=['survey', 'sample_key'],
+                condition=models.Q(completed=True),
+                name='response_sample_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Response to {self.survey.title} by {self.respondent_email or 'Anonymous'}"
@@ -66,6 +99,98 @@ class Answer(models.Model):
     response = models.ForeignKey(Response, related_name='answers', on_delete=models.CASCADE)
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     answer_text = models.TextField()
+    # Typed copies of answer_text, filled on write so aggregates group on native columns
+    rating_value = models.SmallIntegerField(null=True, blank=True)
+    option = models.ForeignKey(
+        QuestionOption, related_name='answers', null=True, blank=True, on_delete=models.SET_NULL
+    )
+    bool_value = models.BooleanField(null=True, blank=True)
+
+    class Meta:
+        # Per-question answer scans use the index Django adds for the question foreign key
+        indexes = [
+            # Grouped option / yes-no / rating aggregates per question
+            models.Index(
+                fields=['question', 'option', 'bool_value', 'rating_value'],
+                name='answer_typed_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Answer to {self.question.question}"
+
+class QuestionTally(models.Model):
+    """Running aggregates for a question, maintained as responses complete"""
+    question = models.OneToOneField(Question, related_name='tally', on_delete=models.CASCADE)
+    option_counts = models.JSONField(default=dict)
+    rating_histogram = models.JSONField(default=dict)
+    rating_sum = models.BigIntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    answer_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Tally for {self.question.question}"
+
+class PendingSubmission(models.Model):
+    """Outbox row for a response accepted in async ingestion mode, awaiting the drain worker"""
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    attempts = models.IntegerField(default=0)
+    failed = models.BooleanField(default=False)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Pending submission {self.id}"
+
+class SurveyArchive(models.Model):
+    """A closed survey whose responses and answers moved to ArchiveChunk rows.
+
+    Aggregates are snapshotted when archiving starts, so results keep
+    working once the rows have left the hot tables.
+    """
+    survey = models.OneToOneField(Survey, related_name='archive', on_delete=models.CASCADE)
+    # Responses with a higher id arrived after the snapshot and stay live
+    last_response_id = models.BigIntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    segmented_results = models.JSONField(default=dict)
+    response_count = models.IntegerField(default=0)
+    answer_count = models.IntegerField(default=0)
+    raw_bytes = models.BigIntegerField(default=0)
+    compressed_bytes = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Archive of {self.survey.title}"
+
+class ArchiveChunk(models.Model):
+    """One batch of archived responses and their answers, as zlib-compressed columnar JSON"""
+    archive = models.ForeignKey(SurveyArchive, related_name='chunks', on_delete=models.CASCADE)
+    first_response_id = models.BigIntegerField()
+    last_response_id = models.BigIntegerField()
+    response_count = models.IntegerField()
+    answer_count = models.IntegerField()
+    data = models.BinaryField()
+
+    class Meta:
+        ordering = ['first_response_id']
+
+    def __str__(self):
+        return f"Archived responses {self.first_response_id}-{self.last_response_id}"
+
+class ArchivedDedupeKey(models.Model):
+    """Dedupe key of an archived response, still checked against new submissions"""
+    survey = models.ForeignKey(Survey, related_name='archived_dedupe_keys', on_delete=models.CASCADE)
+    dedupe_key = models.CharField(max_length=64)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['survey', 'dedupe_key'], name='archived_dedupe_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Archived dedupe key {self.dedupe_key}"
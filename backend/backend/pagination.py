@@ -0,0 +1,85 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class OptionalCursorPagination(CursorPagination):
+    """Keyset pagination that only applies when the client asks for it.
+
+    Requests without ?cursor= or ?page_size= get the plain list so existing
+    clients keep working; paginated requests seek on the primary key, so
+    deep pages cost the same as the first one.
+    """
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class TextAnswerPagination(CursorPagination):
+    """Cursor pages of a question's text answers, oldest first"""
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class ArchivedTextAnswerPagination(BasePagination):
+    """Pages of an archived question's text answers, read from its chunks.
+
+    ?position= is the (response id, answer id) of the last answer returned,
+    so each page decodes chunks from there only until it is full. After
+    the last archived answer, `next` links to ?live=1: the answers still in
+    the hot tables, paged by TextAnswerPagination.
+    """
+    position_query_param = 'position'
+    live_query_param = 'live'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    invalid_position_message = 'Invalid position'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def decode_position(self, request):
+        encoded = request.query_params.get(self.position_query_param)
+        if encoded is None:
+            return (0, 0)
+        try:
+            response_id, answer_id = (int(part) for part in encoded.split('.'))
+        except ValueError:
+            raise NotFound(self.invalid_position_message)
+        return response_id, answer_id
+
+    def paginate(self, read_page, has_live, request):
+        """Rows of the requested page, from read_page(position, size) ->
+        (rows, more); has_live() says whether to link to live answers"""
+        self.request = request
+        rows, more = read_page(self.decode_position(request), self.get_page_size(request))
+        url = request.build_absolute_uri()
+        if more:
+            self.next = replace_query_param(
+                url, self.position_query_param, f'{rows[-1][0]}.{rows[-1][1]}'
+            )
+        elif has_live():
+            self.next = replace_query_param(
+                remove_query_param(url, self.position_query_param), self.live_query_param, '1'
+            )
+        else:
+            self.next = None
+        return [{'id': answer_id, 'answer_text': answer_text} for _, answer_id, answer_text in rows]
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.next, 'previous': None, 'results': data})
@@ -0,0 +1,52 @@
+"""Read-only payloads built straight from .values() rows.
+
+These reproduce SurveyResponseSerializer and ResponseSerializer output key
+for key without instantiating a serializer or its fields per object. Keep
+them in step with those serializers; benchmark_serializers checks that the
+rendered bytes match.
+"""
+from django.http import Http404
+from rest_framework import serializers
+from .models import Survey, Question, QuestionOption, Answer
+
+QUESTION_FIELDS = ('id', 'type', 'question', 'description', 'required', 'order')
+RESPONSE_FIELDS = ('id', 'survey', 'respondent_email', 'respondent_name', 'department', 'created_at', 'completed')
+
+# DRF's own datetime formatting (ISO 8601 in the current time zone, 'Z' for UTC)
+datetime_field = serializers.DateTimeField()
+
+
+def public_survey_payload(survey_id, public_link):
+    """SurveyResponseSerializer data for an active survey, in three queries"""
+    survey = Survey.objects.filter(
+        id=survey_id, public_link=public_link, status='active'
+    ).values('id', 'title', 'description').first()
+    if survey is None:
+        raise Http404(f'No {Survey._meta.object_name} matches the given query.')
+
+    # Same filters and ordering as prefetch_related('questions__options')
+    questions = list(Question.objects.filter(survey__in=[survey['id']]).values(*QUESTION_FIELDS))
+    options = {}
+    for option in QuestionOption.objects.filter(
+        question__in=[question['id'] for question in questions]
+    ).values('id', 'question_id', 'text', 'order'):
+        options.setdefault(option.pop('question_id'), []).append(option)
+    for question in questions:
+        question['options'] = options.get(question['id'], [])
+
+    survey['questions'] = questions
+    return survey
+
+
+def response_payloads(responses):
+    """ResponseSerializer(many=True) data for a Response queryset, in two queries"""
+    rows = list(responses.values(*RESPONSE_FIELDS))
+    answers = {}
+    for answer in Answer.objects.filter(
+        response__in=responses.values('id')
+    ).order_by('id').values('id', 'question', 'answer_text', 'response_id'):
+        answers.setdefault(answer.pop('response_id'), []).append(answer)
+    for row in rows:
+        row['created_at'] = datetime_field.to_representation(row['created_at'])
+        row['answers'] = answers.get(row['id'], [])
+    return rows
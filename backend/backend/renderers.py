@@ -0,0 +1,39 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:  # optional; JSONRenderer's encoder is used instead
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed.
+
+    For JSON-native data (str, int, bool, None, lists and dicts with string
+    keys) the output is byte-identical to JSONRenderer's compact UTF-8 form.
+    Indented or ASCII-only output, and anything orjson rejects, falls back
+    to JSONRenderer. Floats are not checked for NaN, so keep this to
+    payloads without them.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these for embedding in JavaScript
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+def fast_renderers():
+    """The default renderer classes with JSONRenderer swapped for ORJSONRenderer"""
+    return [
+        ORJSONRenderer() if renderer is JSONRenderer else renderer()
+        for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+    ]
@@ -0,0 +1,97 @@
+"""Read-replica routing for heavy read-only API actions.
+
+Viewsets using ReplicaReadMixin mark their read-only actions; while such a
+request is handled, ReplicaRouter sends ORM reads to READ_REPLICA_ALIAS.
+Every write, and every read made by any other request, uses the primary.
+PrimaryPinMiddleware marks every successful write, whichever view handled
+it, so the client reads its own writes despite replication lag: a
+short-lived cookie for same-site clients, and an X-DB-Primary-Pin response
+header that cross-origin clients (the survey app) echo back on their
+requests until it expires.
+"""
+from asgiref.local import Local
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_COOKIE = 'db_primary_pin'
+PIN_HEADER = 'X-DB-Primary-Pin'
+
+_state = Local()
+
+
+def use_replica(alias):
+    """Route reads for the rest of the current request to `alias` (None for the primary)"""
+    _state.read_alias = alias
+
+
+def read_alias():
+    return getattr(_state, 'read_alias', None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        return True
+
+
+def is_pinned(request):
+    return PIN_COOKIE in request.COOKIES or PIN_HEADER in request.headers
+
+
+def pin_to_primary(request, response):
+    """Mark a successful write's response so the client's next reads use the primary"""
+    if (
+        settings.READ_REPLICA_ALIAS is not None
+        and request.method not in SAFE_METHODS
+        and response.status_code < 400
+    ):
+        seconds = settings.READ_REPLICA_STICKY_SECONDS
+        response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+        response[PIN_HEADER] = str(seconds)
+    return response
+
+
+class ReplicaReadMixin:
+    """Serve `replica_actions` from the read replica unless the client is pinned"""
+    replica_actions = ('list', 'retrieve')
+
+    def replica_for(self, request):
+        alias = settings.READ_REPLICA_ALIAS
+        if (
+            alias is None
+            or request.method not in SAFE_METHODS
+            or self.action not in self.replica_actions
+            or is_pinned(request)
+        ):
+            return None
+        return alias
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        use_replica(self.replica_for(request))
+
+
+class PrimaryPinMiddleware:
+    """Pins the client to the primary after every successful write"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return pin_to_primary(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return pin_to_primary(request, await self.get_response(request))
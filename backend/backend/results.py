@@ -0,0 +1,97 @@
+from .models import Response, Answer, QuestionTally
+from .tallies import CHOICE_TYPES, rebuild_tallies
+
+RATING_SCALE = range(1, 11)
+
+
+def rating_summary(tally):
+    """Average and 1-10 distribution for a rating question's tally"""
+    if not tally.rating_count:
+        return {}
+    return {
+        'averageRating': tally.rating_sum / tally.rating_count,
+        'distribution': [
+            {'rating': i, 'count': tally.rating_histogram.get(str(i), 0)}
+            for i in RATING_SCALE
+        ],
+    }
+
+
+def question_result(question, tally):
+    """Results entry for one question.
+
+    Text questions only report answerCount; their answers are listed by
+    the paginated /api/questions/<id>/answers/ endpoint.
+    """
+    question_data = {
+        'id': question.id,
+        'type': question.type,
+        'question': question.question,
+        'responses': []
+    }
+    if question.type in CHOICE_TYPES:
+        question_data['responses'] = [
+            {'option': option, 'count': count}
+            for option, count in tally.option_counts.items()
+        ]
+    elif question.type == 'rating':
+        question_data.update(rating_summary(tally))
+    else:
+        question_data['answerCount'] = tally.answer_count
+    return question_data
+
+
+def completed_responses(survey):
+    return Response.objects.filter(survey=survey, completed=True)
+
+
+def text_answers(question, search=None):
+    """Answers of completed responses to a text question, optionally filtered
+    to those containing `search` (case-insensitive).
+
+    Text answers never have a typed value; filtering on that lets Postgres
+    use the partial trigram index from migration 0007 for the search.
+    """
+    answers = Answer.objects.filter(
+        question=question,
+        response__completed=True,
+        option__isnull=True,
+        bool_value__isnull=True,
+        rating_value__isnull=True
+    )
+    if search:
+        answers = answers.filter(answer_text__icontains=search)
+    return answers.values('id', 'answer_text')
+
+
+def survey_results(survey, total_responses=None):
+    """Build the results payload for a survey from its question tallies.
+
+    Aggregates are read from QuestionTally in O(questions); questions that
+    have no tally yet are rebuilt from their answers on first access.
+    Text answers are not included, see question_result. `total_responses`
+    defaults to a count of the completed responses.
+    """
+    questions = list(survey.questions.all())
+    if total_responses is None:
+        total_responses = completed_responses(survey).count()
+
+    tallies = {
+        tally.question_id: tally
+        for tally in QuestionTally.objects.filter(question__survey=survey)
+    }
+    missing = [question for question in questions if question.id not in tallies]
+    if missing:
+        tallies.update(rebuild_tallies(missing))
+
+    results = {
+        'id': survey.id,
+        'title': survey.title,
+        'totalResponses': total_responses,
+        'questions': []
+    }
+
+    for question in questions:
+        results['questions'].append(question_result(question, tallies[question.id]))
+
+    return results
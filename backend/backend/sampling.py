@@ -0,0 +1,153 @@
+"""Approximate results from a simple random sample of completed responses.
+
+Every response gets a uniform random sample_key when it is inserted, so
+the completed responses with the lowest keys are a simple random sample
+of the survey's completed responses. Reading them walks the
+(survey, sample_key) index and stops after the sample, whatever the size
+of the survey. The same responses are sampled until new ones arrive.
+Proportions get Wilson score intervals and rating means normal intervals,
+both with a finite population correction, so a sample that covers every
+response collapses to the exact values. Both intervals assume simple
+random sampling without replacement.
+"""
+import math
+from django.db.models import Count
+from .models import Answer, QuestionTally
+from .results import completed_responses, RATING_SCALE
+from .tallies import CHOICE_TYPES, apply_answer, row_label
+
+DEFAULT_SAMPLE_SIZE = 2000
+MAX_SAMPLE_SIZE = 10000
+CONFIDENCE_LEVEL = 0.95
+Z_SCORE = 1.959964  # two-sided 95%
+
+
+def sample_size(requested, default=DEFAULT_SAMPLE_SIZE):
+    """Validated ?sample_size=, capped at MAX_SAMPLE_SIZE; raises ValueError"""
+    if requested in (None, ''):
+        return default
+    size = int(requested)
+    if size < 1:
+        raise ValueError('sample_size must be positive')
+    return min(size, MAX_SAMPLE_SIZE)
+
+
+def sample_response_ids(survey, size):
+    """Ids of a simple random sample of `size` completed responses"""
+    # Every response of the survey is equally likely, unlike page sampling
+    # (TABLESAMPLE), whose clustered rows would make the intervals too narrow
+    return list(
+        completed_responses(survey).order_by('sample_key').values_list('id', flat=True)[:size]
+    )
+
+
+def correction(sampled, total):
+    """Finite population correction factor for the standard error"""
+    if total <= 1:
+        return 0.0
+    return math.sqrt(max(0.0, (total - sampled) / (total - 1)))
+
+
+def proportion_interval(successes, sampled, total):
+    """Wilson score interval for a proportion estimated from a sample"""
+    if not sampled:
+        return [0.0, 1.0]
+    p = successes / sampled
+    fpc = correction(sampled, total)
+    if fpc == 0:
+        return [p, p]
+    # Shrinking the variance by fpc^2 is the same as enlarging n by 1/fpc^2
+    n = sampled / fpc ** 2
+    z2 = Z_SCORE ** 2
+    centre = (p + z2 / (2 * n)) / (1 + z2 / n)
+    spread = Z_SCORE * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    return [max(0.0, centre - spread), min(1.0, centre + spread)]
+
+
+def mean_interval(tally, sampled, total):
+    """Normal interval for the mean rating, from the sampled histogram"""
+    count = tally.rating_count
+    mean = tally.rating_sum / count
+    if count < 2:
+        return [mean, mean]
+    variance = sum(
+        int(rating) * int(rating) * n for rating, n in tally.rating_histogram.items()
+    ) / count - mean * mean
+    stderr = math.sqrt(max(0.0, variance) * count / (count - 1) / count)
+    spread = Z_SCORE * stderr * correction(sampled, total)
+    return [mean - spread, mean + spread]
+
+
+def sampled_tallies(questions, response_ids):
+    """In-memory tallies of the sampled responses' answers, keyed by question id"""
+    types = {question.id: question.type for question in questions}
+    tallies = {question.id: QuestionTally(question=question) for question in questions}
+    rows = Answer.objects.filter(
+        question_id__in=types, response_id__in=response_ids
+    ).values(
+        'question_id', 'option__text', 'bool_value', 'rating_value', 'answer_text'
+    ).annotate(count=Count('id')).order_by()
+    for row in rows:
+        question_id = row['question_id']
+        typed = row['option__text'] is not None or row['bool_value'] is not None
+        label = row_label(row) if typed else row['answer_text']
+        apply_answer(tallies[question_id], types[question_id], label, row['rating_value'], row['count'])
+    return tallies
+
+
+def approximate_results(survey, size=DEFAULT_SAMPLE_SIZE):
+    """Results estimated from a sample of completed responses.
+
+    Counts are scaled up to the survey's total; choice options also carry
+    the estimated proportion and its interval, and rating questions the
+    interval of their mean.
+    """
+    questions = list(survey.questions.all())
+    total = completed_responses(survey).count()
+    response_ids = sample_response_ids(survey, size) if total else []
+    sampled = len(response_ids)
+    tallies = sampled_tallies(questions, response_ids) if sampled else {
+        question.id: QuestionTally(question=question) for question in questions
+    }
+    scale = total / sampled if sampled else 0
+
+    results = {
+        'id': survey.id,
+        'title': survey.title,
+        'mode': 'approx',
+        'totalResponses': total,
+        'sampleSize': sampled,
+        'confidenceLevel': CONFIDENCE_LEVEL,
+        'questions': []
+    }
+    for question in questions:
+        tally = tallies[question.id]
+        question_data = {
+            'id': question.id,
+            'type': question.type,
+            'question': question.question,
+            'responses': []
+        }
+        if question.type in CHOICE_TYPES:
+            question_data['responses'] = [
+                {
+                    'option': option,
+                    'count': round(count * scale),
+                    'proportion': count / sampled,
+                    'interval': proportion_interval(count, sampled, total),
+                }
+                for option, count in tally.option_counts.items()
+            ]
+        elif question.type == 'rating':
+            if tally.rating_count:
+                question_data['averageRating'] = tally.rating_sum / tally.rating_count
+                question_data['averageRatingInterval'] = mean_interval(tally, sampled, total)
+                question_data['distribution'] = [
+                    {'rating': i, 'count': round(tally.rating_histogram.get(str(i), 0) * scale)}
+                    for i in RATING_SCALE
+                ]
+        else:
+            question_data['answerCount'] = round(tally.answer_count * scale)
+        results['questions'].append(question_data)
+
+    return results
@@ -0,0 +1,151 @@
+import random
+import uuid
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from .answers import typed_answer_fields
+from .models import Survey, Question, QuestionOption, Response, Answer
+
+SURVEY_TITLES = [
+    ('Customer Satisfaction Survey', 'Help us improve our services by sharing your experience'),
+    ('Employee Engagement Survey', 'Annual employee feedback survey'),
+    ('Product Feedback Survey', 'Share your thoughts on our new product'),
+    ('Onboarding Experience Survey', 'Tell us how your first weeks went'),
+    ('Event Feedback Survey', 'Let us know what you thought of the event'),
+]
+QUESTION_TEMPLATES = [
+    ('multiple_choice', 'How satisfied are you with {topic}?'),
+    ('rating', 'How likely are you to recommend {topic} to others?'),
+    ('yes_no', 'Would you use {topic} again?'),
+    ('text', 'What would you improve about {topic}?'),
+]
+# bulk_update writes one CASE expression per batch, which grows quadratically
+CREATED_AT_BATCH_SIZE = 500
+TOPICS = ['our service', 'your role', 'the product', 'the onboarding', 'the event', 'our support team']
+SATISFACTION_OPTIONS = ['Very satisfied', 'Satisfied', 'Neutral', 'Dissatisfied', 'Very dissatisfied']
+DEPARTMENTS = ['Sales', 'Marketing', 'Engineering', 'Customer Support', 'HR']
+TEXT_ANSWERS = [
+    'Faster response times would help.',
+    'More flexible options, please.',
+    'Everything worked well for me.',
+    'The process was confusing at first.',
+    'Better documentation would be useful.',
+    'Keep up the good work!',
+]
+
+
+class SurveyGenerator:
+    """Generates surveys, questions and completed responses in bulk.
+
+    Each question gets its own answer distribution (skewed option weights,
+    a rating mean, a yes probability) so aggregates look like real data.
+    Passing a seed makes the generated answers reproducible.
+    """
+
+    def __init__(self, creators, seed=None, batch_size=10000, days=90):
+        self.creators = creators
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.days = days
+        self.option_ids = {}
+
+    def generate(self, surveys, questions, responses, status='active'):
+        created = []
+        for i in range(surveys):
+            with transaction.atomic():
+                survey = self.create_survey(i, status)
+                survey_questions = self.create_questions(survey, questions)
+                self.create_responses(survey, survey_questions, responses)
+            created.append(survey)
+        return created
+
+    def create_survey(self, index, status):
+        title, description = SURVEY_TITLES[index % len(SURVEY_TITLES)]
+        if index >= len(SURVEY_TITLES):
+            title = f'{title} #{index // len(SURVEY_TITLES) + 1}'
+        return Survey.objects.create(
+            creator=self.creators[index % len(self.creators)],
+            title=title,
+            description=description,
+            status=status,
+            public_link=uuid.uuid4().hex[:12]
+        )
+
+    def create_questions(self, survey, count):
+        survey_questions = Question.objects.bulk_create([
+            Question(
+                survey=survey,
+                type=QUESTION_TEMPLATES[order % len(QUESTION_TEMPLATES)][0],
+                question=QUESTION_TEMPLATES[order % len(QUESTION_TEMPLATES)][1].format(
+                    topic=self.random.choice(TOPICS)
+                ),
+                required=order % len(QUESTION_TEMPLATES) != 3,
+                order=order + 1
+            )
+            for order in range(count)
+        ])
+        options = QuestionOption.objects.bulk_create([
+            QuestionOption(question=question, text=text, order=order)
+            for question in survey_questions
+            if question.type == 'multiple_choice'
+            for order, text in enumerate(SATISFACTION_OPTIONS)
+        ])
+        for option in options:
+            self.option_ids.setdefault(option.question_id, {})[option.text] = option.id
+        return survey_questions
+
+    def answer_sampler(self, question):
+        """Return a callable producing answer_text for `question`, or None to skip"""
+        skip_rate = 0.0 if question.required else 0.3
+
+        if question.type == 'multiple_choice':
+            weights = [self.random.expovariate(1.0) for _ in SATISFACTION_OPTIONS]
+            sample = lambda: self.random.choices(SATISFACTION_OPTIONS, weights)[0]
+        elif question.type == 'rating':
+            mean = self.random.uniform(4, 9)
+            sample = lambda: str(min(10, max(1, round(self.random.gauss(mean, 2)))))
+        elif question.type == 'yes_no':
+            yes_rate = self.random.uniform(0.3, 0.9)
+            sample = lambda: 'Yes' if self.random.random() < yes_rate else 'No'
+        else:
+            sample = lambda: self.random.choice(TEXT_ANSWERS)
+
+        def answer():
+            if skip_rate and self.random.random() < skip_rate:
+                return None
+            return sample()
+        return answer
+
+    def create_responses(self, survey, survey_questions, count):
+        samplers = [(question, self.answer_sampler(question)) for question in survey_questions]
+        now = timezone.now()
+        per_batch = max(1, self.batch_size // max(1, len(survey_questions)))
+
+        for start in range(0, count, per_batch):
+            batch = Response.objects.bulk_create([
+                Response(
+                    survey=survey,
+                    respondent_email=f'respondent{i}.{survey.id}@example.com',
+                    respondent_name=f'Respondent {i}',
+                    department=self.random.choice(DEPARTMENTS),
+                    completed=True
+                )
+                for i in range(start, min(start + per_batch, count))
+            ])
+            # auto_now_add overwrites created_at on insert, so spread the dates afterwards
+            for response in batch:
+                response.created_at = now - timedelta(seconds=self.random.randrange(self.days * 86400))
+            Response.objects.bulk_update(batch, ['created_at'], batch_size=CREATED_AT_BATCH_SIZE)
+            answers = []
+            for response in batch:
+                for question, sample in samplers:
+                    answer_text = sample()
+                    if answer_text is None:
+                        continue
+                    typed = typed_answer_fields(
+                        question.type, answer_text, self.option_ids.get(question.id, {})
+                    )
+                    answers.append(Answer(
+                        response=response, question=question, answer_text=answer_text, **typed
+                    ))
+            Answer.objects.bulk_create(answers, batch_size=self.batch_size)
@@ -0,0 +1,109 @@
+"""Results split by respondent department and/or response date.
+
+Every aggregate comes from grouped SQL: response counts per segment and
+answer counts per (segment, question, value), which are folded into one
+in-memory QuestionTally per segment and question.
+"""
+from django.db.models import Count, DateField, F
+from django.db.models.functions import TruncDay, TruncWeek
+from .models import QuestionTally
+from .results import completed_responses, question_result
+from .tallies import apply_answer, row_label, typed_answer_rows, untyped_answer_rows, answer_count_rows
+
+GROUP_BY_FIELDS = ('department',)
+BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,  # weeks start on Monday
+}
+# Every segmentation the API accepts, used to invalidate cached results
+SEGMENTATIONS = [
+    (group_by, bucket)
+    for group_by in (None, *GROUP_BY_FIELDS)
+    for bucket in (None, *BUCKETS)
+    if group_by or bucket
+]
+
+
+def answer_segment(group_by, bucket):
+    """Named expressions identifying an Answer row's segment through its response"""
+    expressions = {}
+    if group_by:
+        expressions[group_by] = F(f'response__{group_by}')
+    if bucket:
+        expressions['period'] = BUCKETS[bucket]('response__created_at', output_field=DateField())
+    return expressions
+
+
+def segment_key(row, names):
+    return tuple(row[name] for name in names)
+
+
+def segmented_results(survey, group_by=None, bucket=None):
+    """Results payload with one entry per segment, ordered by segment.
+
+    Segments are keyed by `group_by` (a Response field) and/or `period`
+    (the first day of the day or week bucket). Choice and rating questions
+    are summarised as in survey_results.
+    """
+    questions = list(survey.questions.all())
+    types = {question.id: question.type for question in questions}
+    answer_segment_fields = answer_segment(group_by, bucket)
+    names = list(answer_segment_fields)
+    segments = {}
+
+    def segment(key):
+        if key not in segments:
+            segments[key] = {
+                'totalResponses': 0,
+                'tallies': {question.id: QuestionTally(question=question) for question in questions},
+            }
+        return segments[key]
+
+    responses = completed_responses(survey)
+    if bucket:
+        responses = responses.annotate(period=BUCKETS[bucket]('created_at', output_field=DateField()))
+    for row in responses.values(*names).annotate(count=Count('id')).order_by():
+        segment(segment_key(row, names))['totalResponses'] = row['count']
+
+    grouped_ids = [pk for pk, question_type in types.items() if question_type != 'text']
+    if grouped_ids:
+        for row in typed_answer_rows(grouped_ids, **answer_segment_fields):
+            question_id = row['question_id']
+            apply_answer(
+                segment(segment_key(row, names))['tallies'][question_id],
+                types[question_id], row_label(row), row['rating_value'], row['count']
+            )
+        for row in untyped_answer_rows(grouped_ids, **answer_segment_fields):
+            question_id = row['question_id']
+            apply_answer(
+                segment(segment_key(row, names))['tallies'][question_id],
+                types[question_id], row['answer_text'], count=row['count']
+            )
+
+    text_ids = [pk for pk, question_type in types.items() if question_type == 'text']
+    if text_ids:
+        for row in answer_count_rows(text_ids, **answer_segment_fields):
+            segment(segment_key(row, names))['tallies'][row['question_id']].answer_count = row['count']
+
+    results = {
+        'id': survey.id,
+        'title': survey.title,
+        'groupBy': group_by,
+        'bucket': bucket,
+        'totalResponses': sum(data['totalResponses'] for data in segments.values()),
+        'segments': []
+    }
+    # None (no department) sorts first
+    for key in sorted(segments, key=lambda key: [(value is not None, value) for value in key]):
+        data = segments[key]
+        segment_data = {
+            name: value.isoformat() if name == 'period' else value
+            for name, value in zip(names, key)
+        }
+        segment_data['totalResponses'] = data['totalResponses']
+        segment_data['questions'] = [
+            question_result(question, data['tallies'][question.id]) for question in questions
+        ]
+        results['segments'].append(segment_data)
+
+    return results
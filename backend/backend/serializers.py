@@ -1,14 +1,26 @@
+import logging
 from rest_framework import serializers
 from .models import Survey, Question, QuestionOption, Response, Answer
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from .builder import save_question, save_questions
+from .dedupe import IDEMPOTENCY_KEY_MAX_LENGTH
+from .submissions import answered_question_ids, preload_questions, save_submissions
+
+logger = logging.getLogger(__name__)
 
 class QuestionOptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuestionOption
         fields = ['id', 'text', 'order']
 
+class SurveyQuestionOptionSerializer(QuestionOptionSerializer):
+    """Option within a question save: an `id` updates that option, none adds one"""
+    id = serializers.IntegerField(required=False)
+
 class QuestionSerializer(serializers.ModelSerializer):
-    options = QuestionOptionSerializer(many=True, required=False)
+    options = SurveyQuestionOptionSerializer(many=True, required=False)
 
     class Meta:
         model = Question
@@ -18,22 +30,40 @@ class QuestionSerializer(serializers.ModelSerializer):
         options_data = validated_data.pop('options', [])
         question = Question.objects.create(**validated_data)
         for option_data in options_data:
+            option_data.pop('id', None)
             QuestionOption.objects.create(question=question, **option_data)
         return question
 
+    def update(self, instance, validated_data):
+        """Update the question and, when `options` is sent, diff them in (see builder.py)"""
+        return save_question(instance, validated_data)
+
+class SurveyQuestionSerializer(QuestionSerializer):
+    """Question within a survey save: an `id` updates that question, none adds one"""
+    id = serializers.IntegerField(required=False)
+
 class SurveySerializer(serializers.ModelSerializer):
-    questions = QuestionSerializer(many=True, required=False)
+    questions = SurveyQuestionSerializer(many=True, required=False)
     response_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Survey
         fields = ['id', 'title', 'description', 'creator', 'created_at', 
-                 'updated_at', 'status', 'public_link', 'questions', 'response_count']
+                 'updated_at', 'status', 'public_link', 'unique_respondents',
+                 'questions', 'response_count']
         read_only_fields = ['creator', 'created_at', 'updated_at', 'public_link']
 
     def get_response_count(self, obj):
+        # Use the annotation from SurveyViewSet.get_queryset when present
+        if hasattr(obj, 'response_count'):
+            return obj.response_count
         return obj.responses.count()
 
+    def to_representation(self, instance):
+        # Two queries for the nested questions and options unless already prefetched
+        prefetch_related_objects([instance], 'questions__options')
+        return super().to_representation(instance)
+
     def create(self, validated_data):
         questions_data = validated_data.pop('questions', [])
         try:
@@ -42,18 +72,32 @@ class SurveySerializer(serializers.ModelSerializer):
             admin_user = User.objects.get(is_superuser=True)  # Gets the first superuser
             validated_data['creator'] = admin_user
             
-            survey = Survey.objects.create(**validated_data)
-            for question_data in questions_data:
-                options_data = question_data.pop('options', [])
-                question = Question.objects.create(survey=survey, **question_data)
-                if question.type == 'multiple_choice':
-                    for option_data in options_data:
-                        QuestionOption.objects.create(question=question, **option_data)
+            with transaction.atomic():
+                survey = Survey.objects.create(**validated_data)
+                save_questions(survey, questions_data)
             return survey
         except Exception as e:
-            print(f"Error creating survey: {str(e)}")
+            logger.warning('Error creating survey: %s', e)
             raise serializers.ValidationError(str(e))
 
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        """Update the survey and, when `questions` is sent, diff them in (see builder.py)"""
+        questions_data = validated_data.pop('questions', None)
+        instance = super().update(instance, validated_data)
+        if questions_data is not None:
+            save_questions(instance, questions_data)
+        return instance
+
+class SurveySummarySerializer(serializers.ModelSerializer):
+    """Serializer for survey listings (without nested questions)"""
+    response_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Survey
+        fields = ['id', 'title', 'description', 'creator', 'created_at',
+                 'updated_at', 'status', 'public_link', 'response_count']
+
 class AnswerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Answer
@@ -82,31 +126,84 @@ class SurveyResponseSerializer(serializers.ModelSerializer):
         model = Survey
         fields = ['id', 'title', 'description', 'questions']
 
+class PreloadedRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolves primary keys from a map in the serializer context when present.
+
+    Lets callers validate many submissions against objects loaded once
+    instead of one lookup per field.
+    """
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        objects = self.root.context.get(self.context_key)
+        if objects is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return objects[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
 class AnswerCreateSerializer(serializers.ModelSerializer):
+    question = PreloadedRelatedField('questions', queryset=Question.objects.all())
+
     class Meta:
         model = Answer
         fields = ['question', 'answer_text']
 
 class ResponseCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new responses"""
+    survey = PreloadedRelatedField('surveys', queryset=Survey.objects.all())
     answers = AnswerCreateSerializer(many=True)
+    idempotency_key = serializers.CharField(
+        max_length=IDEMPOTENCY_KEY_MAX_LENGTH, required=False, allow_blank=True, write_only=True
+    )
 
     class Meta:
         model = Response
         fields = [
             'survey', 'respondent_email', 'respondent_name',
-            'department', 'answers'
+            'department', 'answers', 'idempotency_key'
         ]
 
+    def to_internal_value(self, data):
+        # Resolve every answered question in one query instead of one per answer
+        if 'questions' not in self.context:
+            self.context['questions'] = preload_questions(answered_question_ids([data]))
+        return super().to_internal_value(data)
+
+    @transaction.atomic
     def create(self, validated_data):
-        answers_data = validated_data.pop('answers')
-        response = Response.objects.create(**validated_data)
-        
-        for answer_data in answers_data:
-            Answer.objects.create(response=response, **answer_data)
-        
-        # Mark response as completed
-        response.completed = True
-        response.save()
-        
-        return response
+        return save_submissions([validated_data])[0]
+
+class QueuedResponseSerializer(serializers.Serializer):
+    """Shape-only validation for submissions queued without touching the database"""
+    survey = serializers.IntegerField(min_value=1)
+    respondent_email = serializers.EmailField(required=False, allow_null=True, allow_blank=True)
+    respondent_name = serializers.CharField(max_length=200, required=False, allow_null=True, allow_blank=True)
+    department = serializers.CharField(max_length=200, required=False, allow_null=True, allow_blank=True)
+    answers = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=True
+    )
+    idempotency_key = serializers.CharField(
+        max_length=IDEMPOTENCY_KEY_MAX_LENGTH, required=False, allow_blank=True
+    )
+
+    def validate_answers(self, answers):
+        for answer in answers:
+            question = answer.get('question')
+            if isinstance(question, bool) or not isinstance(question, (int, str)):
+                raise serializers.ValidationError('Each answer needs a question id.')
+            if not isinstance(answer.get('answer_text'), str):
+                raise serializers.ValidationError('Each answer needs an answer_text string.')
+        return [
+            {'question': answer['question'], 'answer_text': answer['answer_text']}
+            for answer in answers
+        ]
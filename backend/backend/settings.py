@@ -10,12 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def env_flag(name, default=False):
+    return os.environ.get(name, '1' if default else '0').lower() in ('1', 'true', 'yes', 'on')
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
 
@@ -51,6 +57,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'backend.replicas.PrimaryPinMiddleware',
+    # Last, so it times the view itself
+    'backend.instrumentation.RequestMetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -77,17 +86,87 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Connections are reused for DB_CONN_MAX_AGE seconds (0 closes them after
+# every request) and checked before reuse when DB_CONN_HEALTH_CHECKS is set
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'surveydb',
-        'USER': 'surveyuser',
-        'PASSWORD': 'password',
-        'HOST': 'localhost',
-        'PORT': 5432,
+        'NAME': os.environ.get('DB_NAME', 'surveydb'),
+        'USER': os.environ.get('DB_USER', 'surveyuser'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'password'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': int(os.environ.get('DB_PORT', 5432)),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': env_flag('DB_CONN_HEALTH_CHECKS', default=True),
+        'OPTIONS': {},
     }
 }
 
+# DB_POOL=1 hands connections out from psycopg 3's pool instead; Django
+# requires CONN_MAX_AGE to be 0 in that case
+if env_flag('DB_POOL'):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }
+
+# DB_ENGINE=sqlite3 runs against a local SQLite file instead (benchmarks, quick checks)
+if os.environ.get('DB_ENGINE') == 'sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        }
+    }
+
+# DB_REPLICA_NAME and/or DB_REPLICA_HOST add a read replica that serves the
+# read-only analytics actions (list, retrieve, results, export). With
+# DB_ENGINE=sqlite3 two files can stand in for primary and replica.
+if os.environ.get('DB_REPLICA_NAME') or os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+        'TEST': {'MIRROR': 'default'},
+    }
+    if 'HOST' in DATABASES['default']:
+        DATABASES['replica']['HOST'] = os.environ.get('DB_REPLICA_HOST', DATABASES['default']['HOST'])
+
+DATABASE_ROUTERS = ['backend.replicas.ReplicaRouter']
+READ_REPLICA_ALIAS = 'replica' if 'replica' in DATABASES else None
+# Seconds a client reads from the primary after one of its own writes
+READ_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 10))
+
+# Caching
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Public survey definitions and segmented results are cached here and
+# invalidated on save. Invalidation only reaches every worker through a shared
+# backend, so set REDIS_URL whenever more than one process serves the API.
+# Without it each process keeps its own LocMemCache and entries expire after
+# a few seconds, which bounds how long another worker serves stale data.
+
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+    PUBLIC_SURVEY_CACHE_TIMEOUT = 60 * 60
+    SEGMENTED_RESULTS_CACHE_TIMEOUT = 10 * 60
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    PUBLIC_SURVEY_CACHE_TIMEOUT = 30
+    SEGMENTED_RESULTS_CACHE_TIMEOUT = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -134,6 +213,10 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://frontend:3000",
 ]
+# The survey app sends Idempotency-Key (see dedupe.py) and echoes the
+# read-your-writes pin back as a header (see replicas.py)
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'x-db-primary-pin')
+CORS_EXPOSE_HEADERS = ['X-DB-Primary-Pin']
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -144,3 +227,47 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
 }
+
+# Number of rows inserted per bulk_create when importing respondent CSVs
+RESPONDENT_IMPORT_BATCH_SIZE = 5000
+
+# Submissions validated and written per transaction by the NDJSON response import
+RESPONSE_IMPORT_BATCH_SIZE = 1000
+
+# Responses moved per transaction (and per compressed chunk) by archive_surveys
+ARCHIVE_BATCH_SIZE = 1000
+
+# Recently written submission dedupe keys remembered per process
+RESPONSE_DEDUPE_CACHE_SIZE = 10000
+
+# Rows fetched per server-side cursor round-trip when streaming response exports
+RESPONSE_EXPORT_CHUNK_SIZE = 2000
+
+# 'sync' writes responses on the request thread; 'async' validates the payload
+# shape, queues it in PendingSubmission and returns 202 for drain_submissions
+RESPONSE_INGESTION_MODE = os.environ.get('RESPONSE_INGESTION_MODE', 'sync')
+
+# Fraction of requests timed by RequestMetricsMiddleware (Server-Timing header,
+# /api/metrics/). Keep it around 0.01 in production to stay under 1% overhead.
+REQUEST_METRICS_SAMPLE_RATE = float(
+    os.environ.get('REQUEST_METRICS_SAMPLE_RATE', 1.0 if DEBUG else 0.01)
+)
+# Slowest statements kept per action for /api/metrics/slow-queries/
+REQUEST_METRICS_SLOWEST_QUERIES = 5
+# Bearer token that lets a scraper read /api/metrics/ without a staff login.
+# Unset, only staff users can read the metrics endpoints.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'backend': {
+            'handlers': ['console'],
+            'level': os.environ.get('BACKEND_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
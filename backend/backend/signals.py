@@ -0,0 +1,52 @@
+from django.core.signals import request_started, request_finished
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .caching import invalidate_public_survey, invalidate_segmented_results
+from .health import record_connection
+from .instrumentation import instrument_connection
+from .replicas import use_replica
+from .models import Survey, Question, QuestionOption, Response
+
+
+@receiver([post_save, post_delete], sender=Survey)
+def survey_changed(sender, instance, **kwargs):
+    invalidate_public_survey(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    invalidate_public_survey(instance.survey_id)
+    invalidate_segmented_results([instance.survey_id])
+
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+def option_changed(sender, instance, origin=None, **kwargs):
+    # Cascades from question deletes and queryset deletes (builder.save_questions)
+    # invalidate in their caller
+    if origin is not None and origin is not instance:
+        return
+    survey_id = Question.objects.filter(
+        id=instance.question_id
+    ).values_list('survey_id', flat=True).first()
+    if survey_id is not None:
+        invalidate_public_survey(survey_id)
+        invalidate_segmented_results([survey_id])
+
+
+@receiver([post_save, post_delete], sender=Response)
+def response_changed(sender, instance, **kwargs):
+    # Bulk inserts of completed responses invalidate in save_submissions
+    invalidate_segmented_results([instance.survey_id])
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    record_connection(connection)
+    instrument_connection(connection)
+
+
+@receiver([request_started, request_finished])
+def reset_read_database(sender, **kwargs):
+    # Replica routing is per request; finished fires after streamed bodies are sent
+    use_replica(None)
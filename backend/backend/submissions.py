@@ -0,0 +1,65 @@
+from django.db import transaction
+from .answers import option_ids_by_text, typed_answer_fields
+from .caching import invalidate_segmented_results
+from .dedupe import remember_on_commit, submission_key
+from .models import Question, Response, Answer
+from .tallies import record_answers
+
+
+def answered_question_ids(payloads):
+    """Question ids referenced by raw submission payloads, ignoring malformed entries"""
+    question_ids = set()
+    for payload in payloads:
+        answers = payload.get('answers') if hasattr(payload, 'get') else None
+        if not isinstance(answers, list):
+            continue
+        for answer in answers:
+            try:
+                question_ids.add(int(answer['question']))
+            except (KeyError, TypeError, ValueError):
+                pass
+    return question_ids
+
+
+def preload_questions(question_ids):
+    """Questions with their options prefetched, keyed by id"""
+    return Question.objects.prefetch_related('options').in_bulk(question_ids)
+
+
+def answer_typed_fields(answer_data):
+    question = answer_data['question']
+    option_ids = {}
+    if question.type == 'multiple_choice':
+        option_ids = option_ids_by_text(question.options.all())
+    return typed_answer_fields(question.type, answer_data['answer_text'], option_ids)
+
+
+def save_submissions(submissions):
+    """Insert validated submissions as completed responses with their answers.
+
+    `submissions` are ResponseCreateSerializer validated_data dicts. Responses
+    and answers are each written with one bulk_create and the tallies are
+    updated once for the whole batch; call inside a transaction. Cached
+    segmented results of the affected surveys are dropped on commit.
+    Duplicates (see dedupe.py) raise IntegrityError; filter them first with
+    find_duplicates.
+    """
+    answers_data = [submission.pop('answers') for submission in submissions]
+    dedupe_keys = [submission_key(submission) for submission in submissions]
+    for submission in submissions:
+        submission.pop('idempotency_key', None)
+    # A repeated dedupe key fails here, on the unique constraint, before any answer is written
+    responses = Response.objects.bulk_create([
+        Response(completed=True, dedupe_key=key and key[1], **submission)
+        for submission, key in zip(submissions, dedupe_keys)
+    ])
+    answers = Answer.objects.bulk_create([
+        Answer(response=response, **answer_data, **answer_typed_fields(answer_data))
+        for response, response_answers in zip(responses, answers_data)
+        for answer_data in response_answers
+    ])
+    record_answers(answers)
+    remember_on_commit(responses)
+    survey_ids = {response.survey_id for response in responses}
+    transaction.on_commit(lambda: invalidate_segmented_results(survey_ids))
+    return responses
@@ -0,0 +1,200 @@
+from collections import defaultdict
+from django.db.models import Count, Q
+from django.utils import timezone
+from .answers import YES_NO_LABELS
+from .models import Answer, QuestionTally, SurveyArchive
+
+CHOICE_TYPES = ('multiple_choice', 'yes_no')
+TALLY_FIELDS = [
+    'option_counts', 'rating_histogram', 'rating_sum',
+    'rating_count', 'answer_count', 'updated_at'
+]
+
+
+def apply_answer(tally, question_type, label, rating_value=None, count=1):
+    """Fold `count` occurrences of an answer into an in-memory tally.
+
+    `label` is the option shown in results for choice questions; ratings
+    are counted from their typed `rating_value`.
+    """
+    tally.answer_count += count
+    if question_type in CHOICE_TYPES:
+        add_count(tally.option_counts, label, count)
+    elif question_type == 'rating' and rating_value is not None:
+        add_count(tally.rating_histogram, str(rating_value), count)
+        tally.rating_sum += rating_value * count
+        tally.rating_count += count
+
+
+def add_count(counts, key, count):
+    # A recount has no entry for a value nobody chose, so drop keys that reach zero
+    counts[key] = counts.get(key, 0) + count
+    if counts[key] == 0:
+        del counts[key]
+
+
+def answer_label(answer):
+    """Results label for a choice answer: Yes/No for parsed yes-no values, else the text"""
+    if answer.bool_value is not None:
+        return YES_NO_LABELS[answer.bool_value]
+    return answer.answer_text
+
+
+def row_label(row):
+    """Results label for a grouped typed-answer row"""
+    if row['bool_value'] is not None:
+        return YES_NO_LABELS[row['bool_value']]
+    return row['option__text']
+
+
+# The row helpers below also group by any extra `segment` expressions
+# (e.g. department=F('response__department')), see segments.py
+
+def typed_answer_rows(question_ids, **segment):
+    """Answer counts per question and typed value (option, yes/no, rating)"""
+    return Answer.objects.filter(
+        Q(option__isnull=False) | Q(bool_value__isnull=False) | Q(rating_value__isnull=False),
+        question_id__in=question_ids,
+        response__completed=True
+    ).values(
+        'question_id', 'option__text', 'bool_value', 'rating_value', **segment
+    ).annotate(count=Count('id')).order_by()
+
+
+def untyped_answer_rows(question_ids, **segment):
+    """Answer counts per (question, answer_text) for answers with no typed value"""
+    return Answer.objects.filter(
+        question_id__in=question_ids,
+        response__completed=True,
+        option__isnull=True,
+        bool_value__isnull=True,
+        rating_value__isnull=True
+    ).values('question_id', 'answer_text', **segment).annotate(count=Count('id')).order_by()
+
+
+def answer_count_rows(question_ids, **segment):
+    """Answer counts per question over completed responses"""
+    return Answer.objects.filter(
+        question_id__in=question_ids,
+        response__completed=True
+    ).values('question_id', **segment).annotate(count=Count('*')).order_by()
+
+
+def compute_tallies(questions):
+    """Recompute tallies for `questions` from answers of completed responses.
+
+    Returns unsaved QuestionTally instances keyed by question id.
+    """
+    questions = list(questions)
+    types = {question.id: question.type for question in questions}
+    tallies = {question.id: QuestionTally(question=question) for question in questions}
+
+    grouped_ids = [pk for pk, question_type in types.items() if question_type != 'text']
+    if grouped_ids:
+        for row in typed_answer_rows(grouped_ids):
+            question_id = row['question_id']
+            apply_answer(tallies[question_id], types[question_id], row_label(row), row['rating_value'], row['count'])
+        for row in untyped_answer_rows(grouped_ids):
+            question_id = row['question_id']
+            apply_answer(tallies[question_id], types[question_id], row['answer_text'], count=row['count'])
+
+    text_ids = [pk for pk, question_type in types.items() if question_type == 'text']
+    if text_ids:
+        for row in answer_count_rows(text_ids):
+            tallies[row['question_id']].answer_count = row['count']
+
+    return tallies
+
+
+def rebuild_tallies(questions):
+    """Recompute and store tallies for `questions`, replacing existing rows"""
+    tallies = compute_tallies(questions)
+    now = timezone.now()
+    for tally in tallies.values():
+        tally.updated_at = now
+    QuestionTally.objects.bulk_create(
+        tallies.values(),
+        update_conflicts=True,
+        unique_fields=['question'],
+        update_fields=TALLY_FIELDS,
+    )
+    return tallies
+
+
+def check_tallies(questions):
+    """Compare stored tallies with a fresh recount.
+
+    Returns a list of (question, field, stored, actual) tuples for every
+    field that has drifted. Questions without a tally are skipped, as
+    results builds those on first use, and so are questions of archived
+    surveys: their answers are no longer in the Answer table, so the
+    stored tallies cannot be recounted.
+    """
+    questions = list(questions)
+    archived = set(SurveyArchive.objects.filter(
+        survey_id__in={question.survey_id for question in questions}
+    ).values_list('survey_id', flat=True))
+    stored = {
+        tally.question_id: tally
+        for tally in QuestionTally.objects.filter(
+            question__in=[question for question in questions if question.survey_id not in archived]
+        )
+    }
+    drift = []
+    for question_id, actual in compute_tallies(
+        question for question in questions if question.id in stored
+    ).items():
+        tally = stored[question_id]
+        for field in TALLY_FIELDS[:-1]:
+            if getattr(tally, field) != getattr(actual, field):
+                drift.append((actual.question, field, getattr(tally, field), getattr(actual, field)))
+    return drift
+
+
+def record_answers(answers, count=1):
+    """Add the answers of a newly completed response to the stored tallies.
+
+    With count=-1, subtract the answers of a response that was deleted or
+    is no longer completed. Must run in the same transaction that made the
+    change, after it. Questions without a tally yet get an empty row first,
+    so that concurrent writers wait on the same lock, and are then recounted
+    from scratch, which already reflects the change.
+    """
+    by_question = defaultdict(list)
+    questions = {}
+    for answer in answers:
+        questions[answer.question.id] = answer.question
+        by_question[answer.question.id].append(answer)
+    if not by_question:
+        return
+
+    def locked_tallies():
+        return {
+            tally.question_id: tally
+            for tally in QuestionTally.objects.select_for_update().filter(
+                question_id__in=by_question
+            ).order_by('question_id')
+        }
+
+    tallies = locked_tallies()
+    missing = [question for pk, question in questions.items() if pk not in tallies]
+    recounted = {}
+    if missing:
+        # select_for_update cannot lock rows that do not exist yet
+        QuestionTally.objects.bulk_create(
+            [QuestionTally(question=question) for question in missing], ignore_conflicts=True
+        )
+        tallies = locked_tallies()
+        recounted = compute_tallies(missing)
+
+    now = timezone.now()
+    for question_id, tally in tallies.items():
+        if question_id in recounted:
+            for field in TALLY_FIELDS[:-1]:
+                setattr(tally, field, getattr(recounted[question_id], field))
+        else:
+            question_type = questions[question_id].type
+            for answer in by_question[question_id]:
+                apply_answer(tally, question_type, answer_label(answer), answer.rating_value, count)
+        tally.updated_at = now
+    QuestionTally.objects.bulk_update(tallies.values(), TALLY_FIELDS)
@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from .archiving import archive_survey
+from .cloning import clone_survey
+from .models import Survey, Question, Response
+
+
+class CloneArchivedSurveyTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user('creator')
+        self.survey = Survey.objects.create(title='Pulse', creator=self.creator, status='closed')
+        Question.objects.create(survey=self.survey, type='text', question='Comments?', order=0)
+        for email, name, department in [
+            ('ada@example.com', 'Ada', 'Research'),
+            ('ada@example.com', 'Ada', 'Research'),
+            ('bo@example.com', 'Bo', 'Sales'),
+            ('', 'Nobody', 'Sales'),
+            (None, None, None),
+        ]:
+            Response.objects.create(
+                survey=self.survey, respondent_email=email, respondent_name=name,
+                department=department, completed=True
+            )
+
+    def roster(self, survey):
+        return sorted(
+            survey.responses.values_list('respondent_email', 'respondent_name', 'department')
+        )
+
+    def test_roster_of_archived_survey(self):
+        archive_survey(self.survey, batch_size=2)
+        self.assertFalse(Response.objects.filter(survey=self.survey).exists())
+        self.survey.refresh_from_db()
+
+        clone, counts = clone_survey(self.survey, include_roster=True)
+
+        self.assertEqual(counts['respondents'], 2)
+        self.assertEqual(self.roster(clone), [
+            ('ada@example.com', 'Ada', 'Research'),
+            ('bo@example.com', 'Bo', 'Sales'),
+        ])
+        self.assertFalse(clone.responses.filter(completed=True).exists())
+
+    def test_roster_merges_archived_and_live_rows(self):
+        archive_survey(self.survey)
+        Response.objects.create(
+            survey=self.survey, respondent_email='bo@example.com', respondent_name='Bo', department='Sales'
+        )
+        Response.objects.create(
+            survey=self.survey, respondent_email='cy@example.com', respondent_name='Cy', department='Ops'
+        )
+        self.survey.refresh_from_db()
+
+        clone, counts = clone_survey(self.survey, include_roster=True)
+
+        self.assertEqual(counts['respondents'], 3)
+        self.assertEqual([email for email, _, _ in self.roster(clone)], [
+            'ada@example.com', 'bo@example.com', 'cy@example.com'
+        ])
@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import SurveyViewSet, QuestionViewSet, ResponseViewSet
+from . import async_views, health, instrumentation
 
 router = DefaultRouter()
 router.register(r'surveys', SurveyViewSet, basename='survey')
@@ -27,4 +28,15 @@ router.register(r'responses', ResponseViewSet, basename='response')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
+    # Async (ASGI) variants of the respondent endpoints
+    path(
+        'api/async/surveys/<int:pk>/public/<str:public_link>/',
+        async_views.public_survey,
+        name='async-survey-public'
+    ),
+    path('api/async/responses/', async_views.submit_response, name='async-response-create'),
+    path('api/health/', health.health, name='health'),
+    path('api/health/db/', health.database_stats, name='health-db'),
+    path('api/metrics/', instrumentation.metrics, name='metrics'),
+    path('api/metrics/slow-queries/', instrumentation.slow_queries, name='metrics-slow-queries'),
 ]
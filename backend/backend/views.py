@@ -1,31 +1,79 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response as DRFResponse
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
-from .models import Survey, Question, Response, Answer
+from .models import Survey, Question, Response
 from .serializers import (
-    SurveySerializer, QuestionSerializer, 
+    SurveySerializer, SurveySummarySerializer, QuestionSerializer,
     ResponseSerializer, SurveyResponseSerializer,
-    ResponseCreateSerializer
+    ResponseCreateSerializer, QueuedResponseSerializer
+)
+from .archiving import archived_results, archived_text_answer_page, segmentation_key, survey_archive
+from .builder import ensure_editable
+from .cloning import clone_survey
+from .dedupe import (
+    dedupe_key, duplicate_reply, forget_on_commit, is_archived, is_stored, recently_seen,
+    request_idempotency_key
+)
+from .payloads import public_survey_payload, response_payloads
+from .renderers import fast_renderers
+from .caching import (
+    get_public_survey, set_public_survey, get_segmented_results, set_segmented_results
 )
+from .exports import EXPORT_FORMATS, export_responses
+from .importers import import_batch_size, import_respondents, import_responses
+from .ingestion import queue_stats, queue_submission
+from .pagination import OptionalCursorPagination, TextAnswerPagination, ArchivedTextAnswerPagination
+from .replicas import ReplicaReadMixin
+from .results import survey_results, text_answers
+from .sampling import approximate_results, sample_size
+from .segments import BUCKETS, GROUP_BY_FIELDS, segmented_results
+from .tallies import record_answers
 import csv
-from django.http import HttpResponse
+import logging
+from django.http import Http404, HttpResponse
+from django.utils.http import parse_etags
 import uuid
-from django.db.models import Count
 
-class SurveyViewSet(viewsets.ModelViewSet):
+logger = logging.getLogger(__name__)
+
+class SurveyViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Survey.objects.all()
     serializer_class = SurveySerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = OptionalCursorPagination
+    replica_actions = ('list', 'retrieve', 'results', 'export')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            return queryset.annotate(response_count=Count('responses'))
+        if self.action == 'retrieve':
+            return queryset.annotate(
+                response_count=Count('responses')
+            ).prefetch_related('questions__options')
+        if self.action == 'results':
+            return queryset.select_related('archive')
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'retrieve_public':
             return SurveyResponseSerializer
+        if self.action == 'list':
+            return SurveySummarySerializer
         return SurveySerializer
 
     def perform_create(self, serializer):
         serializer.save(creator=self.request.user if self.request.user.is_authenticated else None)
 
+    def get_renderers(self):
+        if self.action == 'retrieve_public':
+            return fast_renderers()
+        return super().get_renderers()
+
     @action(detail=True, methods=['post'])
     def generate_public_link(self, request, pk=None):
         survey = self.get_object()
@@ -46,118 +94,217 @@ class SurveyViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            decoded_file = csv_file.read().decode('utf-8').splitlines()
-            reader = csv.DictReader(decoded_file)
-            
-            for row in reader:
-                Response.objects.create(
-                    survey=survey,
-                    respondent_email=row.get('email'),
-                    respondent_name=row.get('name'),
-                    department=row.get('department')
-                )
-            
-            return DRFResponse({'message': 'Respondents uploaded successfully'})
+            batch_size = import_batch_size(request.query_params.get('batch_size'))
+        except ValueError:
+            return DRFResponse(
+                {'error': 'batch_size must be a positive integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            stats = import_respondents(survey, csv_file, batch_size)
+            return DRFResponse({'message': 'Respondents uploaded successfully', **stats})
         except Exception as e:
             return DRFResponse(
                 {'error': str(e)}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    @action(detail=True, methods=['post'])
+    def clone(self, request, pk=None):
+        """Copy the survey, its questions and options as a new draft.
+
+        Optional body fields: `title` and `include_roster` (copy respondents,
+        without answers).
+        """
+        survey = self.get_object()
+        include_roster = str(request.data.get('include_roster', '')).lower() in ('1', 'true', 'yes')
+        clone, copied = clone_survey(
+            survey,
+            creator_id=request.user.id if request.user.is_authenticated else None,
+            title=request.data.get('title'),
+            include_roster=include_roster
+        )
+        clone.response_count = copied['respondents']
+        return DRFResponse(
+            {**SurveySummarySerializer(clone).data, 'copied': copied},
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=True, methods=['post'])
+    def import_responses(self, request, pk=None):
+        """Bulk-insert completed responses from NDJSON, sent as the body or a `file` upload"""
+        survey = self.get_object()
+        try:
+            batch_size = import_batch_size(
+                request.query_params.get('batch_size'), 'RESPONSE_IMPORT_BATCH_SIZE'
+            )
+        except ValueError:
+            return DRFResponse(
+                {'error': 'batch_size must be a positive integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.content_type.startswith('multipart/'):
+            lines = request.FILES.get('file')
+            if lines is None:
+                return DRFResponse(
+                    {'error': 'No file provided'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            # Read the body line by line instead of parsing it whole
+            lines = request.stream or []
+        return DRFResponse(import_responses(survey, lines, batch_size))
+
     @action(detail=True, methods=['get'], url_path='public/(?P<public_link>[^/.]+)')
     def retrieve_public(self, request, pk=None, public_link=None):
         """Endpoint for accessing public surveys"""
-        survey = get_object_or_404(
-            Survey, 
-            id=pk, 
-            public_link=public_link, 
-            status='active'
-        )
-        serializer = self.get_serializer(survey)
-        return DRFResponse(serializer.data)
+        try:
+            survey_id = int(pk)
+        except ValueError:
+            raise Http404
+
+        cached = get_public_survey(survey_id, public_link)
+        if cached is None:
+            # Same payload as SurveyResponseSerializer, built from .values() rows
+            data = public_survey_payload(survey_id, public_link)
+            etag = set_public_survey(survey_id, public_link, data)
+        else:
+            etag, data = cached
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return DRFResponse(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return DRFResponse(data, headers={'ETag': etag})
 
     def create(self, request, *args, **kwargs):
-        print("Received data:", request.data)
+        logger.debug('Received survey data: %s', request.data)
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            print("Validation errors:", serializer.errors)
+            logger.debug('Survey validation errors: %s', serializer.errors)
             return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         self.perform_create(serializer)
         return DRFResponse(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """Stream responses as CSV (default) or NDJSON via ?output="""
+        survey = self.get_object()
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return DRFResponse(
+                {'error': f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return export_responses(survey, output)
+
     @action(detail=True, methods=['get'])
     def results(self, request, pk=None):
+        """Survey results, optionally split by ?group_by=department and/or ?bucket=day|week.
+
+        ?mode=approx estimates them from ?sample_size= sampled responses instead.
+        """
         survey = self.get_object()
-        questions = survey.questions.all()
-        
-        # Get all completed responses for this survey
-        total_responses = Response.objects.filter(
-            survey=survey, 
-            completed=True
-        ).count()
-
-        print(f"Debug - Total responses for survey {survey.id}: {total_responses}")  # Add debug log
-
-        results = {
-            'id': survey.id,
-            'title': survey.title,
-            'totalResponses': total_responses,
-            'questions': []
-        }
-
-        for question in questions:
-            question_data = {
-                'id': question.id,
-                'type': question.type,
-                'question': question.question,
-                'responses': []
-            }
-
-            if question.type == 'multiple_choice' or question.type == 'yes_no':
-                answers = Answer.objects.filter(
-                    question=question,
-                    response__completed=True
-                ).values('answer_text').annotate(count=Count('answer_text'))
-                
-                question_data['responses'] = [
-                    {'option': answer['answer_text'], 'count': answer['count']}
-                    for answer in answers
-                ]
-
-            elif question.type == 'rating':
-                answers = Answer.objects.filter(
-                    question=question,
-                    response__completed=True
+        archive = survey_archive(survey)
+        group_by = request.query_params.get('group_by')
+        bucket = request.query_params.get('bucket')
+        mode = request.query_params.get('mode', 'exact')
+        if mode not in ('exact', 'approx'):
+            return DRFResponse(
+                {'error': 'mode must be one of: exact, approx'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if mode == 'approx':
+            if group_by or bucket:
+                return DRFResponse(
+                    {'error': 'mode=approx cannot be combined with group_by or bucket'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-                ratings = [int(a.answer_text) for a in answers if a.answer_text.isdigit()]
-                
-                if ratings:
-                    question_data['averageRating'] = sum(ratings) / len(ratings)
-                    question_data['distribution'] = [
-                        {'rating': i, 'count': ratings.count(i)}
-                        for i in range(1, 11)
-                    ]
-
-            else:  # text responses
-                answers = Answer.objects.filter(
-                    question=question,
-                    response__completed=True
+            try:
+                size = sample_size(request.query_params.get('sample_size'))
+            except ValueError:
+                return DRFResponse(
+                    {'error': 'sample_size must be a positive integer'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-                question_data['responses'] = [
-                    {'answer_text': answer.answer_text}
-                    for answer in answers
-                ]
+            if archive is not None:
+                # Archived surveys answer exactly from stored aggregates, which is cheaper
+                return DRFResponse({**archived_results(survey, archive), 'mode': 'exact'})
+            return DRFResponse(approximate_results(survey, size))
 
-            results['questions'].append(question_data)
+        if not group_by and not bucket:
+            if archive is not None:
+                return DRFResponse(archived_results(survey, archive))
+            return DRFResponse(survey_results(survey))
 
-        return DRFResponse(results)
+        if group_by and group_by not in GROUP_BY_FIELDS:
+            return DRFResponse(
+                {'error': f"group_by must be one of: {', '.join(GROUP_BY_FIELDS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if bucket and bucket not in BUCKETS:
+            return DRFResponse(
+                {'error': f"bucket must be one of: {', '.join(BUCKETS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if archive is not None:
+            # Snapshotted when archiving started
+            return DRFResponse(archive.segmented_results[segmentation_key(group_by, bucket)])
+        data = get_segmented_results(survey.id, group_by, bucket)
+        if data is None:
+            data = segmented_results(survey, group_by, bucket)
+            set_segmented_results(survey.id, group_by, bucket, data)
+        return DRFResponse(data)
 
 class QuestionViewSet(viewsets.ModelViewSet):
     queryset = Question.objects.all()
     serializer_class = QuestionSerializer
     permission_classes = [permissions.AllowAny]
 
-class ResponseViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'answers':
+            return queryset.select_related('survey__archive')
+        return queryset
+
+    # Updates go through builder.save_question (QuestionSerializer.update),
+    # which drops tallies that a type or option change makes stale
+
+    def perform_destroy(self, instance):
+        # The question's tally is deleted with it
+        ensure_editable(instance.survey_id)
+        instance.delete()
+
+    @action(detail=True, methods=['get'])
+    def answers(self, request, pk=None):
+        """Cursor-paginated answers to a text question, filtered by ?search=
+
+        Archived surveys are paged through their chunks first, see
+        ArchivedTextAnswerPagination, then through the live answers.
+        """
+        question = self.get_object()
+        if question.type != 'text':
+            return DRFResponse(
+                {'error': 'Only text questions list their answers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        search = request.query_params.get('search', '').strip()
+        archive = survey_archive(question.survey)
+        if archive is not None and ArchivedTextAnswerPagination.live_query_param not in request.query_params:
+            paginator = ArchivedTextAnswerPagination()
+            page = paginator.paginate(
+                lambda position, size: archived_text_answer_page(archive, question, search, position, size),
+                lambda: text_answers(question, search).exists(),
+                request
+            )
+            return paginator.get_paginated_response(page)
+
+        answers = text_answers(question, search)
+        paginator = TextAnswerPagination()
+        page = paginator.paginate_queryset(answers, request, view=self)
+        return paginator.get_paginated_response(page)
+
+class ResponseViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Response.objects.all()
     serializer_class = ResponseSerializer
     permission_classes = [permissions.AllowAny]
@@ -167,19 +314,80 @@ class ResponseViewSet(viewsets.ModelViewSet):
             return ResponseCreateSerializer
         return ResponseSerializer
 
+    def get_renderers(self):
+        if self.action == 'list':
+            return fast_renderers()
+        return super().get_renderers()
+
+    def list(self, request, *args, **kwargs):
+        # Same payload as ResponseSerializer(many=True), built from .values() rows
+        return DRFResponse(response_payloads(self.filter_queryset(self.get_queryset())))
+
     def create(self, request, *args, **kwargs):
+        idempotency_key = request_idempotency_key(request, request.data)
+        if settings.RESPONSE_INGESTION_MODE == 'async':
+            # Duplicates are dropped when the queue is drained
+            data = request.data.copy()
+            if idempotency_key:
+                data['idempotency_key'] = idempotency_key
+            serializer = QueuedResponseSerializer(data=data)
+            serializer.is_valid(raise_exception=True)
+            queue_submission(serializer.validated_data)
+            return DRFResponse(
+                {'message': 'Response queued for processing'},
+                status=status.HTTP_202_ACCEPTED
+            )
+
         survey_id = request.data.get('survey')
-        survey = get_object_or_404(Survey, id=survey_id)
+        survey = get_object_or_404(Survey.objects.select_related('archive'), id=survey_id)
         
         # Set completed flag to True when creating response
         data = request.data.copy()
         data['completed'] = True
-        
+        if idempotency_key:
+            data['idempotency_key'] = idempotency_key
+
+        # Retries of a recent submission are answered without validating or writing
+        key = dedupe_key(survey, request.data.get('respondent_email'), idempotency_key)
+        if recently_seen(survey.id, key) or is_archived(survey, key):
+            return self.duplicate_response(key)
+
         serializer = self.get_serializer(data=data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
+        try:
+            self.perform_create(serializer)
+        except IntegrityError:
+            if not is_stored(survey.id, key):
+                raise
+            return self.duplicate_response(key)
         
         return DRFResponse(
             {'message': 'Response submitted successfully'},
             status=status.HTTP_201_CREATED
-        )
\ No newline at end of file
+        )
+
+    # Stored tallies count the answers of completed responses, so they follow
+    # a response that is deleted or whose completed flag changes
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        was_completed = serializer.instance.completed
+        response = serializer.save()
+        if response.completed != was_completed:
+            record_answers(response.answers.select_related('question'), 1 if response.completed else -1)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        answers = list(instance.answers.select_related('question')) if instance.completed else []
+        instance.delete()
+        record_answers(answers, -1)
+        forget_on_commit(instance)
+
+    def duplicate_response(self, key):
+        status_code, data = duplicate_reply(key)
+        return DRFResponse(data, status=status_code)
+
+    @action(detail=False, methods=['get'])
+    def queue(self, request):
+        """Backlog metrics for async ingestion mode"""
+        return DRFResponse(queue_stats())
@@ -0,0 +1,75 @@
+'use client';
+
+import { useEffect, useState } from 'react';
+import { fetchTextAnswers } from '../services/api';
+
+interface Props {
+  questionId: number;
+  answerCount: number;
+}
+
+export default function TextAnswers({ questionId, answerCount }: Props) {
+  const [answers, setAnswers] = useState<Array<{ id: number; answer_text: string }>>([]);
+  const [next, setNext] = useState<string | null>(null);
+  const [search, setSearch] = useState('');
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const loadPage = async (pageUrl: string | null, query: string) => {
+    setLoading(true);
+    setError(null);
+    try {
+      const page = await fetchTextAnswers(questionId, { search: query, pageUrl });
+      setAnswers(current => (pageUrl ? [...current, ...page.results] : page.results));
+      setNext(page.next);
+    } catch (error) {
+      setError('Failed to load answers');
+      console.error('Error loading text answers:', error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  // Reload the first page when the search changes, debounced while typing
+  useEffect(() => {
+    const timeout = setTimeout(() => loadPage(null, search.trim()), 300);
+    return () => clearTimeout(timeout);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [questionId, search]);
+
+  return (
+    <div className="space-y-4">
+      <div className="flex justify-between items-center gap-4">
+        <span className="text-sm text-gray-500">{answerCount} answers</span>
+        <input
+          type="search"
+          value={search}
+          onChange={e => setSearch(e.target.value)}
+          placeholder="Search answers"
+          className="border border-gray-300 rounded-md px-3 py-1.5 text-sm text-gray-800"
+        />
+      </div>
+
+      {answers.map(answer => (
+        <div key={answer.id} className="p-4 bg-gray-50 rounded-lg">
+          <p className="text-gray-800">{answer.answer_text}</p>
+        </div>
+      ))}
+
+      {error && <div className="text-sm text-red-600">{error}</div>}
+      {!loading && !error && answers.length === 0 && (
+        <div className="text-sm text-gray-500">No answers found</div>
+      )}
+
+      {next && (
+        <button
+          onClick={() => loadPage(next, search.trim())}
+          disabled={loading}
+          className="text-sm font-medium text-blue-600 hover:text-blue-800 disabled:text-gray-400"
+        >
+          {loading ? 'Loading...' : 'Load more'}
+        </button>
+      )}
+    </div>
+  );
+}
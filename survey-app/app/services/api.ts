@@ -1,11 +1,26 @@
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
 
+// After one of our writes the API answers reads from its primary database for
+// a few seconds, so we see our own changes. Cross-origin requests carry no
+// cookies, so the pin comes back as a header that we echo until it expires.
+const PIN_HEADER = 'X-DB-Primary-Pin';
+let pinnedUntil = 0;
+
+const apiFetch = async (url: string, init: RequestInit = {}) => {
+  const headers = new Headers(init.headers);
+  if (Date.now() < pinnedUntil) headers.set(PIN_HEADER, '1');
+  const response = await fetch(url, { ...init, headers });
+  const seconds = Number(response.headers.get(PIN_HEADER));
+  if (seconds > 0) pinnedUntil = Date.now() + seconds * 1000;
+  return response;
+};
+
 export const fetchSurvey = async (id: string, publicLink?: string) => {
   const url = publicLink 
     ? `${API_BASE_URL}/surveys/${id}/public/${publicLink}/`
     : `${API_BASE_URL}/surveys/${id}/`;
   
-  const response = await fetch(url);
+  const response = await apiFetch(url);
   if (!response.ok) throw new Error('Failed to fetch survey');
   return response.json();
 };
@@ -19,11 +34,13 @@ export const submitSurveyResponse = async (data: {
     question: string;
     answer_text: string;
   }>;
-}) => {
-  const response = await fetch(`${API_BASE_URL}/responses/`, {
+}, idempotencyKey?: string) => {
+  const response = await apiFetch(`${API_BASE_URL}/responses/`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
+      // Lets the backend recognise retries of this submission
+      ...(idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}),
     },
     body: JSON.stringify(data),
   });
@@ -57,7 +74,7 @@ export const createSurvey = async (data: {
 
   console.log('Sending survey data:', transformedData);
 
-  const response = await fetch(`${API_BASE_URL}/surveys/`, {
+  const response = await apiFetch(`${API_BASE_URL}/surveys/`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
@@ -74,16 +91,38 @@ export const createSurvey = async (data: {
 };
 
 export const fetchSurveys = async () => {
-  const response = await fetch(`${API_BASE_URL}/surveys/`);
+  const response = await apiFetch(`${API_BASE_URL}/surveys/`);
   if (!response.ok) throw new Error('Failed to fetch surveys');
   return response.json();
 };
 
 export const fetchSurveyResults = async (id: string) => {
-  const response = await fetch(`${API_BASE_URL}/surveys/${id}/results/`);
+  const response = await apiFetch(`${API_BASE_URL}/surveys/${id}/results/`);
   if (!response.ok) {
     const error = await response.json();
     throw new Error(error.message || 'Failed to fetch survey results');
   }
   return response.json();
-}; 
\ No newline at end of file
+};
+
+export const fetchTextAnswers = async (questionId: number, options: {
+  search?: string;
+  pageUrl?: string | null;
+  pageSize?: number;
+} = {}) => {
+  // `pageUrl` is the `next` link of a previous page, which already carries the cursor
+  let url = options.pageUrl;
+  if (!url) {
+    const params = new URLSearchParams({ page_size: String(options.pageSize ?? 20) });
+    if (options.search) params.set('search', options.search);
+    url = `${API_BASE_URL}/questions/${questionId}/answers/?${params}`;
+  }
+
+  const response = await apiFetch(url);
+  if (!response.ok) throw new Error('Failed to fetch text answers');
+  return response.json() as Promise<{
+    next: string | null;
+    previous: string | null;
+    results: Array<{ id: number; answer_text: string }>;
+  }>;
+};
@@ -25,6 +25,19 @@ interface Survey {
   questions: Question[];
 }
 
+// crypto.randomUUID only exists on secure origins (HTTPS or localhost);
+// getRandomValues works everywhere, so build a version 4 UUID from it instead
+const newIdempotencyKey = (): string => {
+  if (typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID();
+  }
+  const bytes = crypto.getRandomValues(new Uint8Array(16));
+  bytes[6] = (bytes[6] & 0x0f) | 0x40;
+  bytes[8] = (bytes[8] & 0x3f) | 0x80;
+  const hex = Array.from(bytes, (byte) => byte.toString(16).padStart(2, '0')).join('');
+  return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+};
+
 export default function RespondToSurvey() {
   const params = useParams();
   const searchParams = useSearchParams();
@@ -41,6 +54,8 @@ export default function RespondToSurvey() {
     name: '',
     department: ''
   });
+  // One key per filled-in form, so resubmitting after a network error is not counted twice
+  const [idempotencyKey] = useState(newIdempotencyKey);
 
   useEffect(() => {
     const loadSurvey = async () => {
@@ -83,7 +98,7 @@ export default function RespondToSurvey() {
           question: questionId,
           answer_text: answer
         }))
-      });
+      }, idempotencyKey);
       
       router.push(`/surveys/${params.id}/thank-you`);
     } catch (error) {
@@ -6,6 +6,7 @@ import Navigation from '../../../components/Navigation';
 import { fetchSurveyResults } from '../../../services/api';
 import ResponseTrends from '../../../components/ResponseTrends';
 import CompletionRates from '../../../components/CompletionRates';
+import TextAnswers from '../../../components/TextAnswers';
 
 interface QuestionResult {
   id: number;
@@ -14,8 +15,9 @@ interface QuestionResult {
   responses: Array<{
     option?: string;
     count?: number;
-    answer_text?: string;
   }>;
+  // Text questions: answers are fetched page by page from /questions/<id>/answers/
+  answerCount?: number;
   averageRating?: number;
   distribution?: Array<{
     rating: number;
@@ -104,15 +106,7 @@ export default function SurveyResults() {
         );
 
       case 'text':
-        return (
-          <div className="space-y-4">
-            {question.responses.map((response, index) => (
-              <div key={index} className="p-4 bg-gray-50 rounded-lg">
-                <p className="text-gray-800">{response.answer_text}</p>
-              </div>
-            ))}
-          </div>
-        );
+        return <TextAnswers questionId={question.id} answerCount={question.answerCount ?? 0} />;
 
       case 'yes_no':
         return (
@@ -250,7 +244,7 @@ function generateTrendData(results: SurveyResults) {
 function generateCompletionData(results: SurveyResults) {
   return results.questions.map(q => ({
     name: q.question.slice(0, 20) + '...',
-    completed: q.responses.length,
-    incomplete: results.totalResponses - q.responses.length
+    completed: q.answerCount ?? q.responses.length,
+    incomplete: results.totalResponses - (q.answerCount ?? q.responses.length)
   }));
 } 
\ No newline at end of file